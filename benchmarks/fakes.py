@@ -0,0 +1,123 @@
+# benchmarks/fakes.py
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from src.agent.models import GrantAnalysis, GrantInfo, OptimizedQueries
+
+_URL_RE = re.compile(r"^URL: (\S+)$", re.MULTILINE)
+_WORDS = (
+    "grant výzva deadline fellowship etika filozofia teológia religionistika research "
+    "call proposals funding humanitné vedy projekt podpora eligibility postdoc APVV VEGA "
+    "Horizon Europe ERC culture society ethics artificial intelligence"
+).split()
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "big")
+
+def _fake_text(seed: int, size: int) -> str:
+    """Deterministický pseudo-text danej dĺžky (v znakoch)."""
+    words, length, i = [], 0, 0
+    while length < size:
+        word = _WORDS[(seed + i * 7) % len(_WORDS)]
+        words.append(word)
+        length += len(word) + 1
+        i += 1
+    return " ".join(words)[:size]
+
+class FakeSearchTool:
+    """Lokálna náhrada Tavily s nastaviteľnou latenciou, počtom a veľkosťou výsledkov.
+
+    Časť URL (overlap) sa opakuje naprieč dopytmi, aby sa prejavila deduplikácia.
+    """
+
+    def __init__(self, latency: float = 0.0, results_per_query: int = 10, content_size: int = 600, overlap: float = 0.3):
+        self.latency = latency
+        self.results_per_query = results_per_query
+        self.content_size = content_size
+        self.overlap = overlap
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, tool_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+        query = tool_input["query"]
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        shared = int(self.results_per_query * self.overlap)
+        results = []
+        for i in range(self.results_per_query):
+            # Prvých `shared` výsledkov je spoločných pre všetky dopyty
+            key = f"shared-{i}" if i < shared else f"{_seed(query)}-{i}"
+            results.append({
+                "title": f"Grantová výzva {key}",
+                "url": f"https://grants.example.com/call/{key}",
+                "content": _fake_text(_seed(key), self.content_size),
+                "score": round(1.0 - i / max(1, self.results_per_query), 3),
+            })
+        return results
+
+def _messages_to_text(messages: Any) -> str:
+    if isinstance(messages, PromptValue):
+        messages = messages.to_messages()
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages:
+        content = message[1] if isinstance(message, tuple) else getattr(message, "content", message)
+        parts.append(str(content))
+    return "\n".join(parts)
+
+class FakeChatModel(Runnable):
+    """Lokálna náhrada ChatOpenAI pre benchmarky (structured output aj voľný text).
+
+    Zaznamenáva počet volaní a veľkosť promptov (v znakoch) podľa typu volania.
+    """
+
+    def __init__(self, latency: float = 0.0, num_queries: int = 5, grant_ratio: float = 0.5, report_size: int = 2000):
+        self.latency = latency
+        self.num_queries = num_queries
+        self.grant_ratio = grant_ratio
+        self.report_size = report_size
+        self.prompt_chars: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, kind: str, prompt: str) -> None:
+        with self._lock:
+            self.prompt_chars.setdefault(kind, []).append(len(prompt))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        prompt = _messages_to_text(input)
+        self._record("report", prompt)
+        return AIMessage(content=_fake_text(_seed(prompt), self.report_size))
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        def structured(input: Any) -> Any:
+            prompt = _messages_to_text(input)
+            if schema is OptimizedQueries:
+                self._record("query_optimizer", prompt)
+                return OptimizedQueries(queries=[f"grant query {i} {_seed(prompt) % 97}" for i in range(self.num_queries)])
+            if schema is GrantAnalysis:
+                self._record("grant_analyst", prompt)
+                urls = _URL_RE.findall(prompt)
+                step = max(1, round(1 / self.grant_ratio)) if self.grant_ratio else len(urls) + 1
+                return GrantAnalysis(grants=[
+                    GrantInfo(
+                        title=f"Grant {url.rsplit('/', 1)[-1]}", url=url,
+                        relevance_explanation="Syntetický grant pre benchmark.",
+                        deadline="Neznámy", funding_body="Benchmark", region=("Slovakia", "EU", "Global")[i % 3]
+                    )
+                    for i, url in enumerate(urls[::step])
+                ])
+            raise ValueError(f"FakeChatModel nepozná schému {schema!r}")
+        return RunnableLambda(structured)
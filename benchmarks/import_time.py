@@ -0,0 +1,75 @@
+# benchmarks/import_time.py
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Vstupné body, ktoré sa spúšťajú zo skriptov; import modulu nesmie načítať ťažké závislosti
+ENTRY_POINTS = ["src.main", "src.batch", "src.watch", "src.server", "src.config", "src.agent.graph"]
+# Balíky, ktoré sa majú načítať až pri vytvorení grafu, LLM alebo vyhľadávacieho nástroja
+HEAVY_MODULES = ["langchain_openai", "langchain_community", "langchain_core", "langgraph", "openai", "tiktoken"]
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """Importuje modul v novom interpreteri s `-X importtime` a vráti čas importu a načítané moduly."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True, env={**os.environ, "PYTHONIOENCODING": "utf-8"}
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import modulu {module} zlyhal:\n{completed.stderr}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            entries.append({"module": match.group(4), "self_us": int(match.group(1)),
+                            "cumulative_us": int(match.group(2)), "depth": len(match.group(3)) // 2})
+    # -X importtime vypisuje moduly po dokončení importu: podstrom cieľového modulu tvoria riadky
+    # medzi predchádzajúcim importom najvyššej úrovne (napr. site) a riadkom cieľového modulu
+    end = max(i for i, entry in enumerate(entries) if entry["module"] == module and entry["depth"] == 0)
+    start = max((i + 1 for i, entry in enumerate(entries[:end]) if entry["depth"] == 0), default=0)
+    subtree = entries[start:end + 1]
+    loaded = {entry["module"].split(".")[0] for entry in subtree}
+    return {
+        "module": module,
+        "import_ms": round(entries[end]["cumulative_us"] / 1000, 1),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+        "slowest": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 1)}
+            for entry in sorted(subtree, key=lambda entry: entry["cumulative_us"], reverse=True)
+            if entry["depth"] == 1
+        ][:5],
+        "modules_loaded": len(subtree),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Čas importu vstupných bodov CLI (-X importtime) a kontrola lenivých importov.")
+    parser.add_argument("--module", action="append", help="Zmerať iba vybrané moduly (možno zopakovať)")
+    parser.add_argument("--output", help="Uložiť výsledky do JSON súboru")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = [measure_import(module) for module in (args.module or ENTRY_POINTS)]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    # Nenulový návratový kód, ak niektorý vstupný bod načíta ťažkú závislosť už pri importe
+    sys.exit(1 if any(result["heavy_modules"] for result in results) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/run_benchmarks.py
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+# Pridanie koreňového adresára do PYTHONPATH pre správne importy
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from benchmarks.fakes import FakeChatModel, FakeSearchTool
+from src.agent import nodes
+from src.agent.graph import create_graph
+from src.config import GRAPH_MODE
+
+# Scenáre: veľkosť dát, latencie lokálnych náhrad a úroveň súbežnosti
+SCENARIOS: List[Dict[str, Any]] = [
+    {"name": "baseline", "num_queries": 5, "results_per_query": 10, "content_size": 600,
+     "search_latency": 0.05, "llm_latency": 0.1, "concurrency": 1},
+    {"name": "large_content", "num_queries": 5, "results_per_query": 10, "content_size": 4000,
+     "search_latency": 0.05, "llm_latency": 0.1, "concurrency": 1},
+    {"name": "many_results", "num_queries": 6, "results_per_query": 20, "content_size": 600,
+     "search_latency": 0.05, "llm_latency": 0.1, "concurrency": 1},
+    {"name": "concurrent_runs", "num_queries": 5, "results_per_query": 10, "content_size": 600,
+     "search_latency": 0.05, "llm_latency": 0.1, "concurrency": 8},
+    {"name": "regional", "num_queries": 2, "results_per_query": 10, "content_size": 600,
+     "search_latency": 0.05, "llm_latency": 0.1, "concurrency": 1, "graph_mode": "regional"},
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil s lineárnou interpoláciou (bez závislosti na NumPy)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def _install_fakes(scenario: Dict[str, Any]) -> FakeChatModel:
+    """Nahradí globálne nástroje v nodes.py deterministickými lokálnymi náhradami."""
+    fake_llm = FakeChatModel(latency=scenario["llm_latency"], num_queries=scenario["num_queries"])
+    nodes.llm = fake_llm
+    nodes.search_tool = FakeSearchTool(
+        latency=scenario["search_latency"],
+        results_per_query=scenario["results_per_query"],
+        content_size=scenario["content_size"],
+    )
+    # Perzistentné cache a index by skresľovali merania medzi opakovaniami
+    nodes.grant_store = None
+    return fake_llm
+
+def _timed_run(app, query: str) -> Dict[str, float]:
+    """Spustí graf a zmeria trvanie jednotlivých uzlov (podľa času ich výstupov v streame)."""
+    durations: Dict[str, float] = {}
+    start = last = time.perf_counter()
+    for output in app.stream({"user_query": query}, stream_mode="updates"):
+        now = time.perf_counter()
+        for node_name in output:
+            durations[node_name] = durations.get(node_name, 0.0) + (now - last)
+        last = now
+    durations["__total__"] = time.perf_counter() - start
+    return durations
+
+async def _concurrent_runs(app, query: str, count: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(app.ainvoke({"user_query": f"{query} #{i}"}) for i in range(count)))
+    return time.perf_counter() - start
+
+def run_scenario(scenario: Dict[str, Any], runs: int) -> Dict[str, Any]:
+    """Vykoná scenár a vráti štatistiky latencie, priepustnosti, pamäte a veľkosti promptov."""
+    fake_llm = _install_fakes(scenario)
+    # Bez exportéra metrík: benchmark nesmie zapisovať do produkčných logs/metrics.jsonl a Prometheus súboru
+    app = create_graph(mode=scenario.get("graph_mode", GRAPH_MODE), exporter=None)
+    query = "Granty pre výskum etiky umelej inteligencie a religionistiky"
+
+    per_node: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        for node_name, duration in _timed_run(app, query).items():
+            per_node.setdefault(node_name, []).append(duration)
+
+    concurrency = scenario["concurrency"]
+    elapsed = asyncio.run(_concurrent_runs(app, query, concurrency * runs)) if concurrency > 1 else sum(per_node["__total__"])
+
+    # Pamäť meriame v samostatnom behu: tracemalloc výrazne spomaľuje Python kód a skreslil by latencie
+    tracemalloc.start()
+    _timed_run(app, query)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    completed = concurrency * runs if concurrency > 1 else runs
+    return {
+        "scenario": scenario,
+        "runs": runs,
+        "latency_seconds": {
+            node_name: {
+                "p50": round(percentile(values, 50), 4),
+                "p95": round(percentile(values, 95), 4),
+            }
+            for node_name, values in per_node.items()
+        },
+        "throughput_runs_per_second": round(completed / elapsed, 3) if elapsed else None,
+        "peak_memory_bytes": peak_memory,
+        "search_calls": nodes.search_tool.calls,
+        "prompt_chars": {
+            kind: {"calls": len(sizes), "avg": round(statistics.mean(sizes)), "max": max(sizes)}
+            for kind, sizes in fake_llm.prompt_chars.items()
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark Grant Finder agenta (bez sieťových volaní).")
+    parser.add_argument("--runs", type=int, default=5, help="Počet opakovaní každého scenára (predvolene 5)")
+    parser.add_argument("--scenario", action="append", help="Spustiť iba vybrané scenáre (možno zopakovať)")
+    parser.add_argument("--output", help="Uložiť výsledky do JSON súboru")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s["name"] in args.scenario]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "results": [run_scenario(scenario, args.runs) for scenario in scenarios],
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# src/agent/context_packer.py
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Odhad pre prípad, keď tokenizer nie je k dispozícii (napr. offline bez stiahnutého kódovania)
+CHARS_PER_TOKEN = 4
+TRIM_MARKER = " ..."
+
+# Vety s termínmi a podmienkami oprávnenosti sú pre extrakciu grantov najcennejšie (SK + EN)
+KEY_PHRASES_RE = re.compile(
+    r"deadline|uzávierk|uzavret|termín|lehot|do \d{1,2}\.|closing date|due date|submission|predloženi|"
+    r"oprávnen|eligib|žiadate|applicant|podmienk|condition|who can apply|môžu sa uchádzať",
+    re.IGNORECASE
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_token_counters: Dict[str, Callable[[str], int]] = {}
+# Regionálne vetvy balia kontext súbežne; tokenizer sa má načítať iba raz
+_token_counters_lock = threading.Lock()
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """Vráti funkciu na počítanie tokenov pre daný model (tiktoken alebo odhad podľa znakov)."""
+    with _token_counters_lock:
+        if model not in _token_counters:
+            _token_counters[model] = _load_token_counter(model)
+        return _token_counters[model]
+
+def _load_token_counter(model: str) -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.warning(f"Tokenizer pre model '{model}' nie je dostupný ({e}), tokeny odhadujem podľa počtu znakov.")
+        return lambda text: (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT_RE.split(text) if sentence.strip()]
+
+def _truncate(text: str, budget: int, count_tokens: Callable[[str], int]) -> str:
+    """Oreže text na max. `budget` tokenov (binárne hľadanie dĺžky, funguje s ľubovoľným tokenizerom)."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+def trim_to_budget(text: str, budget: int, count_tokens: Callable[[str], int]) -> str:
+    """Zmestí text do rozpočtu tokenov po celých vetách.
+
+    Prednosť majú vety s termínmi a podmienkami (KEY_PHRASES_RE), potom úvodná veta
+    a ostatné vety v pôvodnom poradí. Vybrané vety zostávajú v poradí, v akom boli v texte.
+    """
+    if budget <= 0 or not text:
+        return ""
+    if count_tokens(text) <= budget:
+        return text
+
+    sentences = split_sentences(text)
+    priority = sorted(
+        range(len(sentences)),
+        key=lambda i: (not KEY_PHRASES_RE.search(sentences[i]), i != 0, i)
+    )
+    available = budget - count_tokens(TRIM_MARKER)
+    chosen, used = set(), 0
+    for i in priority:
+        cost = count_tokens(sentences[i]) + 1
+        if used + cost <= available:
+            chosen.add(i)
+            used += cost
+
+    if not chosen:
+        # Ani jedna veta sa nezmestí celá: orežeme najdôležitejšiu
+        return _truncate(sentences[priority[0]], max(available, 0), count_tokens) + TRIM_MARKER
+    return " ".join(sentences[i] for i in sorted(chosen)) + TRIM_MARKER
+
+def pack_results(results: List[Dict[str, Any]], token_budget: int, model: str,
+                 min_tokens_per_result: int = 40, header_tokens: int = 0) -> List[Dict[str, Any]]:
+    """Rozdelí rozpočet tokenov medzi výsledky podľa relevancie.
+
+    Výsledky sa berú v poradí relevancie, kým sa zmestí ich hlavička (názov, URL) a minimálny
+    snippet. Zvyšok rozpočtu sa delí pomerne k skóre `relevance`; čo kratší snippet nevyužije,
+    pripadne ostatným. Orezaný text sa uloží do `llm_content`, pôvodný `content` ostáva
+    (podľa neho index grantov spoznáva zmenené stránky).
+    """
+    count_tokens = get_token_counter(model)
+    remaining = token_budget
+    selected, needs, shares = [], {}, {}
+    for res in sorted(results, key=lambda r: r.get("relevance") or 0.0, reverse=True):
+        overhead = header_tokens + count_tokens(f"{res.get('title') or ''}\n{res.get('url') or ''}")
+        need = count_tokens(res.get("content") or "")
+        # Každý vybraný výsledok má rezervované aspoň minimum pre snippet
+        reserved = min(min_tokens_per_result, need)
+        if overhead + reserved > remaining:
+            break
+        remaining -= overhead + reserved
+        selected.append(res)
+        needs[id(res)], shares[id(res)] = need, reserved
+
+    # Zvyšok sa rozdelí "water-filling"-om: pomerne k relevancii, nevyužitý podiel sa prerozdelí v ďalšom kole
+    open_results = [res for res in selected if needs[id(res)] > 0]
+    while open_results and remaining > 0:
+        weights = {id(res): max(res.get("relevance") or 0.0, 0.0) + 1e-3 for res in open_results}
+        total_weight = sum(weights.values())
+        distributed = 0
+        for res in open_results:
+            key = id(res)
+            share = min(max(1, int(remaining * weights[key] / total_weight)),
+                        needs[key] - shares[key], remaining - distributed)
+            shares[key] += share
+            distributed += share
+        remaining -= distributed
+        open_results = [res for res in open_results if shares[id(res)] < needs[id(res)]]
+        if distributed == 0:
+            break
+
+    # Zachováme pôvodné poradie výsledkov (číslovanie v prompte)
+    packed = []
+    for res in results:
+        key = id(res)
+        if key not in shares:
+            continue
+        content = res.get("content") or ""
+        llm_content = content if shares[key] >= needs[key] else trim_to_budget(content, shares[key], count_tokens)
+        packed.append({**res, "llm_content": llm_content})
+    return packed
@@ -0,0 +1,114 @@
+# src/agent/deadlines.py
+import datetime
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Názvy mesiacov bez diakritiky (SK vo všetkých bežných pádoch + EN vrátane skratiek)
+_MONTH_WORDS = {
+    1: "januar januara januari jan january",
+    2: "februar februara februari feb february",
+    3: "marec marca marci mar march",
+    4: "april aprila aprili apr",
+    5: "maj maja maji may",
+    6: "jun juna juni june",
+    7: "jul jula juli july",
+    8: "august augusta auguste aug",
+    9: "september septembra septembri sep sept",
+    10: "oktober oktobra oktobri oct october",
+    11: "november novembra novembri nov",
+    12: "december decembra decembri dec",
+}
+MONTHS = {word: month for month, words in _MONTH_WORDS.items() for word in words.split()}
+_MONTH_ALT = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+# Texty sa pred hľadaním normalizujú (malé písmená, bez diakritiky), regexy teda diakritiku neobsahujú
+_DATE_RE = re.compile(
+    r"\b(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})\b"
+    r"|\b(?P<num_d>\d{1,2})\s*[./]\s*(?P<num_m>\d{1,2})\s*[./]\s*(?P<num_y>\d{4})\b"
+    rf"|\b(?P<dmy_d>\d{{1,2}})(?:st|nd|rd|th)?\.?\s+(?:of\s+)?(?P<dmy_m>{_MONTH_ALT})\b\.?,?\s+(?P<dmy_y>\d{{4}})\b"
+    rf"|\b(?P<mdy_m>{_MONTH_ALT})\b\.?\s+(?P<mdy_d>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<mdy_y>\d{{4}})\b"
+)
+# Slová, ktoré pred dátumom označujú termín podania (SK + EN)
+_DEADLINE_CONTEXT_RE = re.compile(
+    r"deadline|uzavierk|uzavret|termin|lehot|najneskor|predklad|podavani|podani[ea]|"
+    r"\bclos(?:e|es|ed|ing)\b|\bdue\b|until|submission|apply by|applications? by|open till|"
+    r"\bdo\s*$|\bby\s*$"
+)
+# Kontext pred dátumom, v ktorom hľadáme kľúčové slová (najviac po predchádzajúci dátum)
+CONTEXT_CHARS = 60
+
+def normalize_text(text: str) -> str:
+    """Malé písmená bez diakritiky; dĺžka textu sa pre slovenské znaky nemení."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+def _match_to_date(match: re.Match) -> Optional[datetime.date]:
+    groups = match.groupdict()
+    if groups["iso_y"]:
+        year, month, day = int(groups["iso_y"]), int(groups["iso_m"]), int(groups["iso_d"])
+    elif groups["num_y"]:
+        year, month, day = int(groups["num_y"]), int(groups["num_m"]), int(groups["num_d"])
+        if month > 12 >= day:
+            # Americké poradie MM/DD/RRRR
+            month, day = day, month
+    elif groups["dmy_y"]:
+        year, month, day = int(groups["dmy_y"]), MONTHS[groups["dmy_m"]], int(groups["dmy_d"])
+    else:
+        year, month, day = int(groups["mdy_y"]), MONTHS[groups["mdy_m"]], int(groups["mdy_d"])
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+def find_dates(text: Optional[str]) -> List[dict]:
+    """Nájde v texte všetky dátumy s rokom ("15. marca 2025", "2025-03-15", "March 15, 2025", "15.3.2025").
+
+    Každá položka má `date` a `is_deadline` (pred dátumom je slovo ako deadline, uzávierka, do, until).
+    """
+    normalized = normalize_text(text)
+    found, previous_end = [], 0
+    for match in _DATE_RE.finditer(normalized):
+        date = _match_to_date(match)
+        if date is None:
+            continue
+        context = normalized[max(previous_end, match.start() - CONTEXT_CHARS):match.start()]
+        found.append({"date": date, "is_deadline": bool(_DEADLINE_CONTEXT_RE.search(context))})
+        previous_end = match.end()
+    return found
+
+def parse_deadline(deadline: Optional[str]) -> Optional[datetime.date]:
+    """Prvý dátum v texte deadlinu (napr. z poľa GrantInfo.deadline), inak None."""
+    dates = find_dates(deadline)
+    return dates[0]["date"] if dates else None
+
+def with_deadline_date(grant: Dict[str, Any]) -> Dict[str, Any]:
+    """Doplní ku grantu z LLM normalizovaný dátum `deadline_date` (lokálne, model ho nevypĺňa)."""
+    return {**grant, "deadline_date": parse_deadline(grant.get("deadline"))}
+
+def extract_deadlines(text: Optional[str]) -> List[datetime.date]:
+    """Dátumy, ktoré text uvádza ako termín podania."""
+    return [item["date"] for item in find_dates(text) if item["is_deadline"]]
+
+def is_expired(result: Dict[str, Any], today: Optional[datetime.date] = None) -> bool:
+    """Výsledok vyhľadávania je neaktuálny, ak uvádza termíny podania a všetky už uplynuli.
+
+    Výsledky bez rozpoznaného termínu sa ponechajú (rozhodne o nich LLM).
+    """
+    deadlines = extract_deadlines(f"{result.get('title') or ''}\n{result.get('content') or ''}")
+    return bool(deadlines) and max(deadlines) < (today or datetime.date.today())
+
+def grant_deadline(grant: Dict[str, Any]) -> Optional[datetime.date]:
+    """Deadline grantu ako dátum: normalizované pole `deadline_date`, inak dátum z textu `deadline`.
+
+    `deadline_date` môže byť po načítaní z JSON (watch, server) ISO reťazec.
+    """
+    value = grant.get("deadline_date")
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+    return parse_deadline(grant.get("deadline"))
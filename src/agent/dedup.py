@@ -0,0 +1,190 @@
+# src/agent/dedup.py
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parametre, ktoré neovplyvňujú obsah stránky (sledovanie kampaní, session a pod.)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "igshid", "sessionid", "phpsessid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 6    # Max. Hammingova vzdialenosť pre "takmer zhodné" snippety
+SIMHASH_BANDS = 8           # Počet pásiem indexu (musí byť > SIMHASH_MAX_DISTANCE)
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+def canonicalize_url(url: str) -> str:
+    """Vráti kanonický tvar URL (schéma, host, koncová lomka, sledovacie parametre, fragment)."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    # http aj https považujeme za tú istú stránku, fragment (#...) ignorujeme
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+def simhash(text: str) -> int:
+    """Vypočíta 64-bitový SimHash odtlačok textu zo slovných shinglov."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) >= SHINGLE_SIZE:
+        features = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    else:
+        features = words
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+class SimHashIndex:
+    """Index SimHash odtlačkov pre rýchle hľadanie takmer zhodných textov.
+
+    Odtlačok rozdelíme na pásma; dva odtlačky s vzdialenosťou <= SIMHASH_MAX_DISTANCE
+    sa podľa Dirichletovho princípu zhodujú aspoň v jednom pásme.
+    """
+
+    def __init__(self):
+        self._band_bits = SIMHASH_BITS // SIMHASH_BANDS
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(SIMHASH_BANDS)]
+        self._fingerprints: List[int] = []
+
+    def _bands(self, fingerprint: int):
+        mask = (1 << self._band_bits) - 1
+        for band in range(SIMHASH_BANDS):
+            yield band, fingerprint >> (band * self._band_bits) & mask
+
+    def find(self, fingerprint: int) -> int:
+        """Vráti pozíciu takmer zhodného odtlačku v indexe alebo -1."""
+        for band, value in self._bands(fingerprint):
+            for position in self._buckets[band].get(value, []):
+                if hamming_distance(fingerprint, self._fingerprints[position]) <= SIMHASH_MAX_DISTANCE:
+                    return position
+        return -1
+
+    def add(self, fingerprint: int) -> int:
+        position = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        for band, value in self._bands(fingerprint):
+            self._buckets[band].setdefault(value, []).append(position)
+        return position
+
+def _quality(result: Dict[str, Any]) -> tuple:
+    """Kľúč pre výber najlepšieho reprezentanta (skóre vyhľadávača, potom dĺžka snippetu)."""
+    return (result.get("score") or 0.0, len(result.get("content") or ""))
+
+def deduplicate_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Odstráni duplicitné výsledky podľa kanonickej URL a takmer zhodného obsahu.
+
+    Z každej skupiny duplicít ponechá výsledok s najvyšším skóre, pričom
+    zachová poradie prvého výskytu skupiny.
+    """
+    kept: List[Dict[str, Any]] = []
+    by_url: Dict[str, int] = {}
+    index = SimHashIndex()
+    fingerprint_owner: Dict[int, int] = {}   # pozícia v indexe -> pozícia v kept
+
+    for result in results:
+        canonical = canonicalize_url(result.get("url") or "")
+        text = f"{result.get('title') or ''} {result.get('content') or ''}"
+
+        position = by_url.get(canonical, -1) if canonical else -1
+        has_text = _WORD_RE.search(text) is not None
+        fingerprint = simhash(text) if has_text else 0
+        if position < 0 and has_text:
+            match = index.find(fingerprint)
+            if match >= 0:
+                position = fingerprint_owner[match]
+
+        if position >= 0:
+            if _quality(result) > _quality(kept[position]):
+                kept[position] = {**result, "canonical_url": canonical}
+            if canonical:
+                by_url.setdefault(canonical, position)
+            continue
+
+        position = len(kept)
+        kept.append({**result, "canonical_url": canonical})
+        if canonical:
+            by_url[canonical] = position
+        if has_text:
+            fingerprint_owner[index.add(fingerprint)] = position
+
+    return kept
+
+# Hodnoty, ktoré LLM uvádza pri chýbajúcom údaji
+UNKNOWN_VALUES = ("", "neznámy", "unknown")
+
+def _grant_completeness(grant: Dict[str, Any]) -> tuple:
+    """Kľúč pre výber úplnejšieho záznamu (známy deadline, dlhšie vysvetlenie)."""
+    deadline = (grant.get("deadline") or "").strip().lower()
+    return (deadline not in UNKNOWN_VALUES, len(grant.get("relevance_explanation") or ""))
+
+def _normalize_title(title: str) -> str:
+    return " ".join(_WORD_RE.findall((title or "").lower()))
+
+def grant_identities(grant: Dict[str, Any]) -> List[str]:
+    """Kľúče identity grantu; granty sú duplicitné, ak sa zhodujú v ktoromkoľvek kľúči.
+
+    Samotná URL nestačí (stránka so zoznamom výziev, napr. apvv.sk/grantove-schemy, obsahuje
+    viac grantov) a samotný názov tiež nie (všeobecné názvy ako "Research Fellowship"
+    majú viacerí poskytovatelia). Zhodný názov preto musí sprevádzať rovnaká stránka,
+    alebo rovnaký poskytovateľ (ak ho LLM neuviedol, rovnaká doména).
+    """
+    title = _normalize_title(grant.get("title"))
+    url = canonicalize_url(grant.get("url") or "")
+    if not title:
+        return [f"url:{url}"]
+    keys = [f"page:{url}|{title}"] if url else []
+    funder = _normalize_title(grant.get("funding_body"))
+    if funder not in UNKNOWN_VALUES:
+        keys.append(f"funder:{funder}|{title}")
+    else:
+        keys.append(f"host:{urlsplit(url).netloc}|{title}")
+    return keys
+
+def find_grant(index: Dict[str, int], grant: Dict[str, Any]) -> Optional[int]:
+    """Pozícia duplicitného grantu v indexe kľúč identity -> pozícia, inak None."""
+    return next((index[key] for key in grant_identities(grant) if key in index), None)
+
+def merge_grants(grants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Zlúči granty z viacerých dávok analýzy (duplicity podľa grant_identities), ponechá úplnejší záznam."""
+    merged: List[Dict[str, Any]] = []
+    index: Dict[str, int] = {}
+
+    for grant in grants:
+        position = find_grant(index, grant)
+        if position is None:
+            position = len(merged)
+            merged.append(grant)
+        elif _grant_completeness(grant) > _grant_completeness(merged[position]):
+            merged[position] = grant
+        index.update({key: position for key in grant_identities(grant)})
+
+    return merged
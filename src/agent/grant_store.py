@@ -0,0 +1,220 @@
+# src/agent/grant_store.py
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.agent.dedup import canonicalize_url, grant_identities
+from src.agent.deadlines import grant_deadline
+
+GRANT_FIELDS = ["title", "url", "relevance_explanation", "deadline", "deadline_date", "funding_body", "region"]
+# Verzia schémy (PRAGMA user_version); index staršej verzie sa zahodí a vytvorí nanovo
+SCHEMA_VERSION = 2
+
+def content_hash(result: Dict[str, Any]) -> str:
+    """Hash obsahu výsledku (názov + snippet), podľa ktorého spoznáme zmenenú stránku."""
+    text = f"{result.get('title') or ''}\x1f{result.get('content') or ''}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def query_hash(query: str) -> str:
+    """Hash normalizovaného dopytu. Výsledok analýzy (výber grantov, vysvetlenie relevancie) závisí od dopytu."""
+    return hashlib.sha256(" ".join((query or "").lower().split()).encode("utf-8")).hexdigest()
+
+class GrantStore:
+    """Perzistentný index už analyzovaných stránok a extrahovaných grantov (SQLite + FTS5).
+
+    Analýza stránky je identifikovaná kanonickou URL, hashom snippetu a hashom dopytu.
+    Ak sa stránka od poslednej analýzy pre rovnaký dopyt nezmenila (a záznam nie je
+    starší ako TTL), jej granty netreba posielať do LLM. Iný dopyt stránku analyzuje znova.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS pages (
+                canonical_url TEXT NOT NULL,
+                query_hash TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                analyzed_at REAL NOT NULL,
+                PRIMARY KEY (canonical_url, query_hash)
+            );
+            CREATE TABLE IF NOT EXISTS grants (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                page_url TEXT NOT NULL,
+                query_hash TEXT NOT NULL,
+                title TEXT,
+                url TEXT,
+                relevance_explanation TEXT,
+                deadline TEXT,
+                deadline_date TEXT,
+                funding_body TEXT,
+                region TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_grants_page ON grants(page_url, query_hash);
+            CREATE VIRTUAL TABLE IF NOT EXISTS grants_fts USING fts5(
+                title, relevance_explanation, funding_body, region,
+                content='grants', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS grants_ai AFTER INSERT ON grants BEGIN
+                INSERT INTO grants_fts(rowid, title, relevance_explanation, funding_body, region)
+                VALUES (new.id, new.title, new.relevance_explanation, new.funding_body, new.region);
+            END;
+            CREATE TRIGGER IF NOT EXISTS grants_ad AFTER DELETE ON grants BEGIN
+                INSERT INTO grants_fts(grants_fts, rowid, title, relevance_explanation, funding_body, region)
+                VALUES ('delete', old.id, old.title, old.relevance_explanation, old.funding_body, old.region);
+            END;
+            PRAGMA user_version = {SCHEMA_VERSION};
+            """
+        )
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """Index staršej verzie (bez dopytu v kľúči) nevie priradiť granty k dopytom, preto sa zahodí.
+
+        Je to iba cache analýz: stránky sa pri ďalších behoch analyzujú a uložia znova.
+        """
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'pages'").fetchone()
+        if version >= SCHEMA_VERSION or tables is None:
+            return
+        self._conn.executescript(
+            """
+            DROP TABLE IF EXISTS grants_fts;
+            DROP TABLE IF EXISTS grants;
+            DROP TABLE IF EXISTS pages;
+            """
+        )
+
+    @staticmethod
+    def _row_to_grant(row: tuple) -> Dict[str, Any]:
+        grant = dict(zip(GRANT_FIELDS, row))
+        if grant.get("deadline_date"):
+            grant["deadline_date"] = datetime.date.fromisoformat(grant["deadline_date"])
+        return grant
+
+    @staticmethod
+    def _column_value(grant: Dict[str, Any], field: str) -> Any:
+        if field == "deadline_date":
+            date = grant_deadline(grant)
+            return date.isoformat() if date else None
+        return grant.get(field)
+
+    @staticmethod
+    def _is_valid(grant: Dict[str, Any], today: datetime.date) -> bool:
+        """Grant je platný, ak jeho deadline nie je známy alebo ešte neuplynul."""
+        deadline = grant_deadline(grant)
+        return deadline is None or deadline >= today
+
+    def lookup(self, result: Dict[str, Any], query: str) -> Optional[List[Dict[str, Any]]]:
+        """Vráti platné granty pre nezmenenú stránku už analyzovanú pre tento dopyt, inak None (treba analyzovať)."""
+        canonical = result.get("canonical_url") or canonicalize_url(result.get("url") or "")
+        if not canonical:
+            return None
+        query_key = query_hash(query)
+        with self._lock:
+            page = self._conn.execute(
+                "SELECT content_hash, analyzed_at FROM pages WHERE canonical_url = ? AND query_hash = ?",
+                (canonical, query_key)
+            ).fetchone()
+            if page is None or page[0] != content_hash(result):
+                return None
+            if self.ttl_seconds and time.time() - page[1] > self.ttl_seconds:
+                return None
+            rows = self._conn.execute(
+                f"SELECT {', '.join(GRANT_FIELDS)} FROM grants WHERE page_url = ? AND query_hash = ? ORDER BY id",
+                (canonical, query_key)
+            ).fetchall()
+        today = datetime.date.today()
+        return [grant for grant in map(self._row_to_grant, rows) if self._is_valid(grant, today)]
+
+    def record_page(self, result: Dict[str, Any], query: str, grants: List[Dict[str, Any]]) -> None:
+        """Uloží (alebo nahradí) výsledok analýzy stránky pre daný dopyt vrátane prázdneho zoznamu grantov."""
+        canonical = result.get("canonical_url") or canonicalize_url(result.get("url") or "")
+        if not canonical:
+            return
+        query_key = query_hash(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM grants WHERE page_url = ? AND query_hash = ?", (canonical, query_key))
+            self._conn.executemany(
+                f"INSERT INTO grants (page_url, query_hash, {', '.join(GRANT_FIELDS)}, updated_at) VALUES (?, ?, {', '.join('?' * len(GRANT_FIELDS))}, ?)",
+                [(canonical, query_key, *(self._column_value(grant, field) for field in GRANT_FIELDS), now) for grant in grants]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (canonical_url, query_hash, content_hash, analyzed_at) VALUES (?, ?, ?, ?)",
+                (canonical, query_key, content_hash(result), now)
+            )
+            self._conn.commit()
+
+    def search(self, keyword: str = None, region: str = None, funding_body: str = None,
+               include_expired: bool = False, limit: int = 50,
+               deadline_before: datetime.date = None) -> List[Dict[str, Any]]:
+        """Offline vyhľadávanie v uložených grantoch (fulltext, región, poskytovateľ, deadline do dátumu)."""
+        query = f"SELECT {', '.join('g.' + field for field in GRANT_FIELDS)} FROM grants g"
+        conditions, params = [], []
+        if keyword:
+            query += " JOIN grants_fts f ON f.rowid = g.id"
+            conditions.append("grants_fts MATCH ?")
+            # Každé slovo ako samostatný FTS5 prefixový reťazec (bezpečné voči špeciálnym znakom)
+            params.append(" ".join('"' + word.replace('"', '""') + '"*' for word in keyword.split()))
+        if region:
+            conditions.append("g.region = ? COLLATE NOCASE")
+            params.append(region)
+        if funding_body:
+            conditions.append("g.funding_body LIKE ?")
+            params.append(f"%{funding_body}%")
+        if deadline_before:
+            # ISO dátumy sa v SQLite porovnávajú správne aj ako text
+            conditions.append("g.deadline_date <= ?")
+            params.append(deadline_before.isoformat())
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY g.updated_at DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        today = datetime.date.today()
+        grants, seen = [], set()
+        for grant in map(self._row_to_grant, rows):
+            keys = grant_identities(grant)
+            if seen.intersection(keys) or (not include_expired and not self._is_valid(grant, today)):
+                continue
+            seen.update(keys)
+            grants.append(grant)
+            if len(grants) >= limit:
+                break
+        return grants
+
+if __name__ == "__main__":
+    # Offline dopyt do indexu grantov: python -m src.agent.grant_store --keyword etika --region EU
+    from src.config import GRANT_STORE_PATH, GRANT_STORE_TTL_SECONDS
+
+    parser = argparse.ArgumentParser(description="Vyhľadávanie v lokálnom indexe už extrahovaných grantov.")
+    parser.add_argument("--keyword", help="Fulltextové vyhľadávanie (názov, relevancia, poskytovateľ)")
+    parser.add_argument("--region", help="Región (Slovakia, EU, Global)")
+    parser.add_argument("--funding-body", help="Poskytovateľ (napr. APVV, Horizon Europe)")
+    parser.add_argument("--include-expired", action="store_true", help="Zahrnúť aj granty s uplynutým deadlinom")
+    parser.add_argument("--deadline-before", type=datetime.date.fromisoformat, help="Iba granty s deadlinom najneskôr v daný deň (RRRR-MM-DD)")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    store = GrantStore(GRANT_STORE_PATH, GRANT_STORE_TTL_SECONDS)
+    found = store.search(args.keyword, args.region, args.funding_body, args.include_expired, args.limit, args.deadline_before)
+    print(json.dumps(found, ensure_ascii=False, indent=2, default=str))
@@ -1,37 +1,105 @@
 # src/agent/graph.py
-from langgraph.graph import StateGraph, END
-from src.agent.models import GrantFinderState
-from src.agent.nodes import (
-    node_query_optimizer,
-    node_search_executor,
-    node_grant_analyst,
-    node_report_generator,
-    initialize_tools # Importujeme inicializačnú funkciu
-)
-
-def create_graph():
-    """Vytvorí a skompiluje LangGraph workflow."""
+from typing import TYPE_CHECKING
+
+from src.config import GRAPH_MODE, METRICS_ENABLED, METRICS_JSONL_PATH, METRICS_PROM_PATH
+
+# langgraph, uzly a LangChain sa načítajú až v create_graph (rýchly štart CLI, --help, chyby vstupu)
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+
+# Predvolený exportér metrík podľa konfigurácie (METRICS_ENABLED, cesty v logs/)
+CONFIG_EXPORTER = object()
+
+def create_graph(checkpointer=None, with_report: bool = True, mode: str = GRAPH_MODE, exporter=CONFIG_EXPORTER):
+    """Vytvorí a skompiluje LangGraph workflow.
+
+    `mode="linear"` spustí jednu spoločnú vetvu, `mode="regional"` paralelné vetvy
+    pre Slovensko, EÚ a globálne výzvy, ktorých granty zlúči uzol `merge_regions`.
+
+    Bez reportu (`with_report=False`) graf končí extrakciou grantov; report si volajúci
+    (napr. watch režim) vytvorí sám, iba ak je čo hlásiť.
+
+    S checkpointerom sa stav ukladá po každom uzle pod `thread_id` z konfigurácie behu,
+    takže neúspešný beh možno obnoviť cez `app.stream(None, config)` od uzla, ktorý zlyhal.
+
+    `exporter` určuje, kam idú metriky uzlov: predvolene podľa konfigurácie, vlastný
+    `MetricsExporter` (napr. dočasné súbory v testoch) alebo None (bez merania).
+    """
     
+    from langgraph.graph import StateGraph, START, END
+    from src.agent.models import GrantFinderState, RegionOutput, RegionState
+    from src.agent.nodes import (
+        node_report_generator,
+        fan_out_regions,
+        node_region_output,
+        node_merge_regions,
+        initialize_tools # Importujeme inicializačnú funkciu
+    )
+    from src.agent.tracing import MetricsExporter, traced_node
+
     # 1. Inicializácia nástrojov. Ak zlyhá (napr. kvôli API kľúčom), 
     # chyba (ValueError) sa propaguje a zachytí v main.py.
     initialize_tools()
     
+    if exporter is CONFIG_EXPORTER:
+        exporter = MetricsExporter(METRICS_JSONL_PATH, METRICS_PROM_PATH) if METRICS_ENABLED else None
+
+    def add_node(graph: StateGraph, name: str, node) -> None:
+        # Uzly sú voliteľne obalené meraním metrík. Vstupom uzla je vždy stav daného grafu:
+        # bez obalu by LangGraph odvodil schému z anotácie (GrantFinderState aj v regionálnom subgrafe)
+        graph.add_node(name, traced_node(name, node, exporter) if exporter else node, input=graph.schema)
+
     # 2. Inicializácia grafu so stavom
     workflow = StateGraph(GrantFinderState)
 
-    # 3. Pridanie uzlov
-    workflow.add_node("query_optimizer", node_query_optimizer)
-    workflow.add_node("search_executor", node_search_executor)
-    workflow.add_node("grant_analyst", node_grant_analyst)
-    workflow.add_node("report_generator", node_report_generator)
-
-    # 4. Definícia hrán (postupnosti)
-    workflow.set_entry_point("query_optimizer")
-    workflow.add_edge("query_optimizer", "search_executor")
-    workflow.add_edge("search_executor", "grant_analyst")
-    workflow.add_edge("grant_analyst", "report_generator")
-    workflow.add_edge("report_generator", END)
-
-    # 5. Kompilácia grafu
-    app = workflow.compile()
+    # 3. Pridanie uzlov a hrán
+    if mode == "regional":
+        # Každý región má vlastnú vetvu (subgraf) s cielenými dopytmi a menším kontextom analýzy.
+        # Vetvy bežia paralelne (Send) a do hlavného grafu vracajú iba `regional_grants` (reducer).
+        region_graph = StateGraph(RegionState, output=RegionOutput)
+        _add_search_pipeline(region_graph, add_node)
+        add_node(region_graph, "region_output", node_region_output)
+        region_graph.add_edge("grant_analyst", "region_output")
+        region_graph.add_edge("region_output", END)
+
+        workflow.add_node("region_search", region_graph.compile())
+        add_node(workflow, "merge_regions", node_merge_regions)
+        workflow.add_conditional_edges(START, fan_out_regions, ["region_search"])
+        workflow.add_edge("region_search", "merge_regions")
+        last_node = "merge_regions"
+    else:
+        _add_search_pipeline(workflow, add_node)
+        last_node = "grant_analyst"
+
+    if with_report:
+        add_node(workflow, "report_generator", node_report_generator)
+        workflow.add_edge(last_node, "report_generator")
+        workflow.add_edge("report_generator", END)
+    else:
+        workflow.add_edge(last_node, END)
+
+    # 4. Kompilácia grafu
+    app = workflow.compile(checkpointer=checkpointer)
     return app
+
+def _add_search_pipeline(graph: "StateGraph", add_node) -> None:
+    """Pridá uzly optimizer → vyhľadávanie (adaptívna slučka) → ranking → analýza."""
+    from langgraph.graph import START
+    from src.agent.nodes import (
+        node_query_optimizer,
+        node_search_executor,
+        node_result_ranker,
+        node_grant_analyst,
+        route_after_search,
+    )
+
+    add_node(graph, "query_optimizer", node_query_optimizer)
+    add_node(graph, "search_executor", node_search_executor)
+    add_node(graph, "result_ranker", node_result_ranker)
+    add_node(graph, "grant_analyst", node_grant_analyst)
+
+    graph.add_edge(START, "query_optimizer")
+    graph.add_edge("query_optimizer", "search_executor")
+    # Adaptívna slučka: pri nedostatku kandidátov späť k optimizeru (počet kôl je obmedzený)
+    graph.add_conditional_edges("search_executor", route_after_search, ["query_optimizer", "result_ranker"])
+    graph.add_edge("result_ranker", "grant_analyst")
@@ -1,5 +1,6 @@
 # src/agent/models.py
-from typing import TypedDict, List, Dict, Any
+import operator
+from typing import Annotated, TypedDict, List, Dict, Any
 # Používame pydantic_v1 pre kompatibilitu s LangChain ekosystémom
 from langchain_core.pydantic_v1 import BaseModel, Field
 
@@ -8,10 +9,31 @@ class GrantFinderState(TypedDict):
     """Definuje zdieľaný stav pre LangGraph workflow."""
     user_query: str                 # Pôvodný vstup používateľa
     optimized_queries: List[str]    # Dopyty z Query Optimizer
+    executed_queries: List[str]     # Už spustené dopyty (zo všetkých kôl vyhľadávania)
+    search_round: int               # Počet dokončených kôl vyhľadávania
     search_results: List[Dict[str, Any]] # Surové výsledky zo Search Executor
+    ranked_results: List[Dict[str, Any]] # Top-k výsledky zoradené Result Rankerom
     structured_grants: List[Dict[str, Any]] # Štruktúrované dáta z Grant Analyst
+    # Regionálny režim: granty z paralelných vetiev sa spájajú reducerom (operator.add)
+    regional_grants: Annotated[List[Dict[str, Any]], operator.add]
     final_report: str               # Finálny report
 
+class RegionState(TypedDict):
+    """Stav jednej regionálnej vetvy (subgraf: vyhľadávanie a analýza pre jeden región)."""
+    user_query: str
+    region: str                     # Slovakia, EU alebo Global
+    optimized_queries: List[str]
+    executed_queries: List[str]
+    search_round: int
+    search_results: List[Dict[str, Any]]
+    ranked_results: List[Dict[str, Any]]
+    structured_grants: List[Dict[str, Any]]
+    regional_grants: List[Dict[str, Any]]
+
+class RegionOutput(TypedDict):
+    """Výstup regionálnej vetvy do hlavného grafu (iba pole s reducerom, aby sa vetvy nebili)."""
+    regional_grants: List[Dict[str, Any]]
+
 # 2. Pydantic Modely pre Structured Output
 
 class GrantInfo(BaseModel):
@@ -1,12 +1,52 @@
 # src/agent/nodes.py
+import asyncio
 import datetime
 import logging
+import re
+import threading
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.caches import BaseCache
+from langgraph.types import Send, StreamWriter
 
 # Importy z nášho projektu
-from src.agent.models import GrantFinderState, GrantAnalysis, OptimizedQueries
-from src.config import get_llm, get_search_tool
+from src.agent.models import GrantFinderState, GrantAnalysis, OptimizedQueries, RegionState
+from src.agent.dedup import canonicalize_url, deduplicate_results, merge_grants
+from src.agent.ranking import rank_results
+from src.agent.report import render_report, NO_GRANTS_REPORT
+from src.agent.tracing import record_search
+from src.agent.streaming import REPORT_CHUNK_KEY
+from src.agent.context_packer import pack_results
+from src.agent.deadlines import is_expired, with_deadline_date
+from src.cache import CachedSearchTool, SQLiteLLMCache
+from src.resilience import CircuitOpenError
+from src.config import (
+    get_llm,
+    get_search_tool,
+    get_grant_store,
+    SEARCH_MAX_CONCURRENCY,
+    SEARCH_TIMEOUT_SECONDS,
+    SEARCH_WAVE_SIZE,
+    SEARCH_MIN_SCORE,
+    SEARCH_TARGET_CANDIDATES,
+    SEARCH_MIN_CANDIDATES,
+    SEARCH_MAX_ROUNDS,
+    ANALYST_MODE,
+    ANALYST_BATCH_SIZE,
+    ANALYST_MAX_CONCURRENCY,
+    ANALYST_MAX_RESULTS,
+    ANALYST_TOKEN_BUDGET,
+    ANALYST_MIN_TOKENS_PER_RESULT,
+    MAX_RESULTS_TO_ANALYZE,
+    LLM_MODEL,
+    RANKER_TOP_K,
+    DEADLINE_PREFILTER_ENABLED,
+    REGION_RANKER_TOP_K,
+    SEARCH_REGIONS,
+    REPORT_MODE,
+    LLM_CACHE_BYPASS_NODES,
+)
 
 # Získanie loggera pre tento modul. Konfigurácia (setup) prebehne v main.py.
 logger = logging.getLogger(__name__)
@@ -14,23 +54,55 @@ logger = logging.getLogger(__name__)
 # Globálne premenné pre nástroje (budú inicializované cez initialize_tools)
 llm = None
 search_tool = None
+grant_store = None
 
 def initialize_tools():
-    """Inicializuje globálne nástroje (LLM a Search). Volá sa z create_graph()."""
-    global llm, search_tool
+    """Inicializuje globálne nástroje (LLM, Search a index grantov). Volá sa z create_graph()."""
+    global llm, search_tool, grant_store
     # Skontrolujeme, či už boli inicializované
     if llm is None or search_tool is None:
         logger.info("Inicializujem nástroje (LLM, Tavily)...")
         try:
             llm = get_llm()
             search_tool = get_search_tool()
+            grant_store = get_grant_store()
             logger.info("✅ Nástroje úspešne inicializované.")
         except ValueError as e:
             # Logujeme chybu a propagujeme ju ďalej (zachytí ju main.py)
             logger.error(f"❌ Chyba pri inicializácii nástrojov: {e}")
             raise
 
+def _llm_for(node_name: str):
+    """Vráti LLM pre daný uzol; uzly v LLM_CACHE_BYPASS_NODES dostanú kópiu bez cache."""
+    if node_name in LLM_CACHE_BYPASS_NODES and isinstance(getattr(llm, "cache", None), BaseCache):
+        return llm.model_copy(update={"cache": False})
+    return llm
+
+def _log_llm_cache_stats():
+    cache = getattr(llm, "cache", None)
+    if isinstance(cache, SQLiteLLMCache):
+        stats = cache.cache_stats()
+        logger.info(f"Cache LLM: {stats['hits']} zásahov, {stats['misses']} výpadkov ({stats['size']} záznamov)")
+
 # --- Uzol 1: Query Optimizer ---
+# Zameranie regionálnych vetiev (GRAPH_MODE=regional)
+REGION_FOCUS = {
+    "Slovakia": "Slovensko – slovenčina a slovenské inštitúcie a programy (APVV, VEGA, KEGA, MŠVVaM SR, Fond na podporu umenia).",
+    "EU": "Európska únia – angličtina a európske programy (Horizon Europe, ERC, MSCA, COST, Erasmus+, CERV).",
+    "Global": "Globálne – angličtina, medzinárodné nadácie a fellowships (Templeton, Mellon, Fulbright, NEH).",
+}
+
+# Odhad regiónu dopytu z optimizera (dopyty sú iba reťazce): slovenské inštitúcie a diakritika, európske programy,
+# inak globálne. Slúži na to, aby predčasné ukončenie vyhľadávania nevynechalo celý región.
+REGION_QUERY_PATTERNS = {
+    "Slovakia": re.compile(r"[áäčďéíĺľňóôŕšťúýž]|\b(?:apvv|vega|kega|slovak\w*|slovensk\w*|msvvam)\b", re.IGNORECASE),
+    "EU": re.compile(r"\b(?:eu|europe|european|horizon|erc|msca|marie|cost|erasmus\+?|cerv)\b", re.IGNORECASE),
+}
+
+def query_region(query: str) -> str:
+    """Región, na ktorý dopyt cieli (Slovakia, EU alebo Global)."""
+    return next((region for region, pattern in REGION_QUERY_PATTERNS.items() if pattern.search(query)), "Global")
+
 def node_query_optimizer(state: GrantFinderState) -> dict:
     logger.info("\n--- KROK 1: Optimalizácia dopytov ---")
     user_query = state["user_query"]
@@ -53,9 +125,27 @@ def node_query_optimizer(state: GrantFinderState) -> dict:
     
     Odpovedz presne podľa definovanej Pydantic schémy (OptimizedQueries).
     """
+
+    region = state.get("region")
+    if region:
+        # Regionálna vetva: menší, cielený súbor dopytov iba pre jeden región
+        system_prompt += f"""
+    Táto vetva hľadá iba pre región: {REGION_FOCUS.get(region, region)}
+    Namiesto pravidla 1 vygeneruj 2 až 3 dopyty výhradne pre tento región.
+    """
+
+    executed = state.get("executed_queries") or []
+    if executed:
+        # Doplňujúce kolo: predchádzajúce dopyty priniesli málo silných kandidátov
+        logger.info(f"Doplňujúce kolo vyhľadávania ({state.get('search_round', 0) + 1}/{SEARCH_MAX_ROUNDS}).")
+        system_prompt += f"""
+    Toto je doplňujúce kolo. Tieto dopyty už boli spustené a priniesli málo relevantných výsledkov:
+    {chr(10).join('- ' + query for query in executed)}
+    Vygeneruj 2 až 4 NOVÉ dopyty, ktoré sa od nich líšia (širšie formulácie, synonymá, iné programy a inštitúcie).
+    """
     
     # Využijeme Structured Output
-    structured_llm_optimizer = llm.with_structured_output(OptimizedQueries)
+    structured_llm_optimizer = _llm_for("query_optimizer").with_structured_output(OptimizedQueries)
     
     result = structured_llm_optimizer.invoke(
         [
@@ -69,57 +159,173 @@ def node_query_optimizer(state: GrantFinderState) -> dict:
     return {"optimized_queries": queries}
 
 # --- Uzol 2: Search Executor ---
-def node_search_executor(state: GrantFinderState) -> dict:
-    logger.info("\n--- KROK 2: Vyhľadávanie ---")
-    queries = state["optimized_queries"]
-    all_results = []
-    
-    for query in queries:
-        if not isinstance(query, str) or not query.strip(): continue
-        
+def _run_in_daemon_thread(fn, *args) -> asyncio.Future:
+    """Spustí synchrónnu funkciu v daemon vlákne a vráti future pre bežiacu slučku.
+
+    Tavily volá requests bez HTTP timeoutu. Vlákna ThreadPoolExecutora interpreter pri ukončení
+    čaká, takže uviaznutý dopyt by po vypísaní reportu blokoval koniec procesu (main, batch).
+    Daemon vlákno po timeoute dobehne na pozadí alebo zanikne s procesom; výsledok sa zahodí.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result, error) -> None:
+        if future.done():
+            # Future po timeoute zrušil asyncio.wait_for
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run() -> None:
+        result, error = None, None
+        try:
+            result = fn(*args)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            # Slučka vlny už skončila
+            pass
+
+    threading.Thread(target=run, name="search", daemon=True).start()
+    return future
+
+async def _search_one(query: str, semaphore: asyncio.Semaphore) -> list:
+    """Spustí jeden Tavily dopyt v daemon vlákne s limitom súbežnosti a timeoutom."""
+    async with semaphore:
         logger.info(f"Vyhľadávam: '{query}'...")
+        start = time.perf_counter()
         try:
-            results = search_tool.invoke({"query": query})
-            for res in results:
-                all_results.append({
-                    "title": res.get("title"),
-                    "url": res.get("url"),
-                    "content": res.get("content", "")
-                })
+            # Tavily nástroj je synchrónny (requests), preto ho spúšťame v samostatnom vlákne
+            results = await asyncio.wait_for(
+                _run_in_daemon_thread(search_tool.invoke, {"query": query}),
+                timeout=SEARCH_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Vyhľadávanie dopytu '{query}' prekročilo timeout ({SEARCH_TIMEOUT_SECONDS}s), preskakujem.")
+            return []
+        except CircuitOpenError as e:
+            # Upstream je nedostupný: zlyháme rýchlo, bez stack trace a bez čakania na timeout
+            logger.warning(f"{e} Preskakujem dopyt '{query}'.")
+            return []
         except Exception as e:
             # Logujeme chybu aj so stack trace (exc_info=True) a pokračujeme ďalej
             logger.error(f"Chyba pri vyhľadávaní dopytu '{query}': {e}", exc_info=True)
-            continue
+            return []
+        finally:
+            record_search(time.perf_counter() - start)
 
-    logger.info(f"Celkový počet nájdených surových výsledkov: {len(all_results)}")
-    return {"search_results": all_results}
+    if not isinstance(results, list):
+        # Tavily pri chybe API vracia namiesto zoznamu textový popis výnimky
+        logger.error(f"Neočakávaný výsledok vyhľadávania pre dopyt '{query}': {results}")
+        return []
 
-# --- Uzol 3: Grant Analyst ---
-def node_grant_analyst(state: GrantFinderState) -> dict:
-    logger.info("\n--- KROK 3: Analýza a extrakcia (Structured Output) ---")
-    results = state["search_results"]
-    user_query = state["user_query"]
+    return [
+        {
+            "title": res.get("title"),
+            "url": res.get("url"),
+            "content": res.get("content", ""),
+            "score": res.get("score")
+        }
+        for res in results
+    ]
 
-    if not results:
-        logger.info("Žiadne výsledky na analýzu.")
-        return {"structured_grants": []}
+async def _search_all(queries: list) -> list:
+    """Spustí všetky dopyty naraz a vráti zoznam výsledkov v poradí dopytov."""
+    semaphore = asyncio.Semaphore(max(1, SEARCH_MAX_CONCURRENCY))
+    # asyncio.gather zachováva poradie vstupov, takže zlúčenie výsledkov je deterministické
+    return await asyncio.gather(*(_search_one(query, semaphore) for query in queries))
 
-    # Nakonfigurujeme LLM pre Structured Output
-    structured_llm_analyst = llm.with_structured_output(GrantAnalysis)
+def _run_search_wave(queries: list) -> list:
+    """Spustí vlnu dopytov; dopyt po timeoute nečaká ani koniec vlny, ani ukončenie procesu."""
+    return asyncio.run(_search_all(queries))
 
-    # Pripravíme výsledky pre LLM (optimalizácia pre kontextové okno)
-    results_str = ""
-    MAX_CONTENT_LEN = 600
-    MAX_RESULTS_TO_ANALYZE = 15
+def _interleave_by_region(queries: list) -> list:
+    """Zoradí dopyty striedavo podľa regiónu (SK, EU, Global, SK, ...), aby každá vlna pokryla všetky regióny."""
+    by_region = {}
+    for query in queries:
+        by_region.setdefault(query_region(query), []).append(query)
+    groups = [by_region[region] for region in SEARCH_REGIONS if region in by_region]
+    return [group[i] for i in range(max(map(len, groups), default=0)) for group in groups if i < len(group)]
 
-    for i, res in enumerate(results[:MAX_RESULTS_TO_ANALYZE]):
-        content = res.get('content', '')
-        if content:
-            content = content[:MAX_CONTENT_LEN] + "..." if len(content) > MAX_CONTENT_LEN else content
-        
-        results_str += f"[{i+1}] Title: {res.get('title')}\nURL: {res.get('url')}\nContent Snippet: {content}\n\n---\n\n"
+def _count_strong_candidates(results: list) -> int:
+    """Počet výsledkov s dostatočným skóre (výsledky bez skóre sa počítajú ako silné)."""
+    return sum(1 for res in results if res.get("score") is None or res["score"] >= SEARCH_MIN_SCORE)
 
-    system_prompt = """
+def node_search_executor(state: GrantFinderState) -> dict:
+    logger.info("\n--- KROK 2: Vyhľadávanie ---")
+    executed = list(state.get("executed_queries") or [])
+    queries = [q for q in state["optimized_queries"] if isinstance(q, str) and q.strip() and q not in executed]
+    all_results = list(state.get("search_results") or [])
+
+    # Prvé kolo beží celé naraz (latencia = najpomalší dopyt). Doplňujúce kolá bežia vo vlnách
+    # (paralelne v rámci vlny); keď je silných kandidátov dosť, zvyšok preskočíme.
+    # Uzol beží synchrónne (v hlavnom vlákne alebo vo worker vlákne LangGraphu),
+    # takže si môžeme vytvoriť vlastný event loop.
+    # Vlny striedajú regióny a predčasne skončiť možno až po pokrytí každého regiónu z dopytov optimizera
+    queries = _interleave_by_region(queries)
+    pending_regions = {query_region(query) for query in queries}
+    wave_size = max(1, SEARCH_WAVE_SIZE if executed else len(queries))
+    for start in range(0, len(queries), wave_size):
+        wave = queries[start:start + wave_size]
+        raw_count = len(all_results)
+        for results in _run_search_wave(wave):
+            all_results.extend(results)
+        executed.extend(wave)
+        pending_regions -= {query_region(query) for query in wave}
+
+        # Rovnaké výzvy (APVV, Horizon Europe...) sa vracajú pre viacero dopytov
+        all_results = deduplicate_results(all_results)
+        logger.info(f"Deduplikácia: {raw_count} + nové -> {len(all_results)} unikátnych výsledkov")
+        strong = _count_strong_candidates(all_results)
+        skipped = len(queries) - start - len(wave)
+        if strong >= SEARCH_TARGET_CANDIDATES and skipped and not pending_regions:
+            logger.info(f"⏩ {strong} silných kandidátov stačí, preskakujem {skipped} zvyšných dopytov.")
+            break
+
+    if isinstance(search_tool, CachedSearchTool):
+        stats = search_tool.cache_stats()
+        logger.info(f"Cache vyhľadávania: {stats['hits']} zásahov, {stats['misses']} výpadkov ({stats['size']} záznamov)")
+
+    logger.info(f"Celkový počet výsledkov pre analýzu: {len(all_results)}")
+    return {
+        "search_results": all_results,
+        "executed_queries": executed,
+        "search_round": state.get("search_round", 0) + 1,
+    }
+
+def route_after_search(state: GrantFinderState) -> str:
+    """Podmienená hrana: pri nedostatku silných kandidátov ďalšie kolo optimizera, inak ranking."""
+    strong = _count_strong_candidates(state.get("search_results") or [])
+    if strong < SEARCH_MIN_CANDIDATES and state.get("search_round", 0) < SEARCH_MAX_ROUNDS:
+        logger.info(f"🔄 Iba {strong} silných kandidátov (min. {SEARCH_MIN_CANDIDATES}), žiadam doplňujúce dopyty.")
+        return "query_optimizer"
+    return "result_ranker"
+
+# --- Uzol 3: Result Ranker ---
+def node_result_ranker(state: GrantFinderState) -> dict:
+    logger.info("\n--- KROK 3: Lokálne zoradenie výsledkov (BM25) ---")
+    results = state["search_results"]
+
+    if DEADLINE_PREFILTER_ENABLED:
+        # Výzvy s uplynutým termínom podania LLM aj tak vyradí, netreba zaň platiť tokeny
+        today = datetime.date.today()
+        current = [res for res in results if not is_expired(res, today)]
+        if len(current) < len(results):
+            logger.info(f"🗓️ Vyradených {len(results) - len(current)} výsledkov s uplynutým termínom podania.")
+        results = current
+
+    # Do drahého LLM kontextu pošleme iba najsľubnejších kandidátov (regionálna vetva má menší kontext)
+    top_k = REGION_RANKER_TOP_K if state.get("region") else RANKER_TOP_K
+    ranked = rank_results(results, state["user_query"], top_k)
+    logger.info(f"Do analýzy postupuje {len(ranked)} z {len(results)} výsledkov (top-k = {top_k}).")
+    return {"ranked_results": ranked}
+
+# --- Uzol 4: Grant Analyst ---
+ANALYST_SYSTEM_PROMPT = """
     Si výskumný analytik špecializujúci sa na humanitné vedy (teológia, filozofia, etika, religionistika). 
     Tvojou úlohou je analyzovať poskytnuté výsledky vyhľadávania a extrahovať relevantné grantové príležitosti podľa definovanej schémy (GrantInfo).
 
@@ -129,32 +335,163 @@ def node_grant_analyst(state: GrantFinderState) -> dict:
     3. **Interdisciplinarita:** Akceptuj výzvy z iných oblastí (napr. AI), len ak majú jasne definovaný presah do humanitných vied (napr. Etika AI).
     4. **Presnosť extrakcie:** Extrahuj informácie čo najpresnejšie. Ak deadline nie je explicitne uvedený v snippete, použi 'Neznámy'.
     """
-    
-    # Spustenie analýzy
-    try:
-        analysis_result = structured_llm_analyst.invoke(
-            [
-                ("system", system_prompt),
-                ("human", f"Pôvodná požiadavka: {user_query}\n\nAnalyzuj tieto výsledky vyhľadávania a extrahuj relevantné granty:\n\n{results_str}")
-            ]
-        )
-    except Exception as e:
-        logger.error(f"Chyba pri analýze LLM alebo parsovaní výstupu: {e}", exc_info=True)
-        return {"structured_grants": []} # Vrátime prázdny zoznam v prípade chyby
-
-    # Konverzia Pydantic objektov na slovníky (používame .dict() pre Pydantic V1 kompatibilitu)
-    structured_grants_list = [grant.dict() for grant in analysis_result.grants]
+
+# Približná réžia jedného výsledku v prompte ("[i] Title: ... URL: ... Content Snippet: ... ---")
+RESULT_HEADER_TOKENS = 12
+
+def _format_results_for_llm(results: list, offset: int = 0) -> str:
+    """Pripraví výsledky pre LLM (snippety sú už orezané na rozpočet tokenov cez pack_results)."""
+    results_str = ""
+    for i, res in enumerate(results, start=offset + 1):
+        content = res.get('llm_content', res.get('content', ''))
+        results_str += f"[{i}] Title: {res.get('title')}\nURL: {res.get('url')}\nContent Snippet: {content}\n\n---\n\n"
+    return results_str
+
+def _split_into_batches(results: list) -> list:
+    """Rozdelí výsledky na dávky podľa zvoleného režimu analýzy."""
+    if ANALYST_MODE == "single":
+        # Pôvodné správanie: jedno veľké volanie nad všetkými vybranými výsledkami
+        return [results]
+    size = max(1, ANALYST_BATCH_SIZE)
+    return [results[i:i + size] for i in range(0, len(results), size)]
+
+def _canonical_url(result: dict) -> str:
+    return result.get("canonical_url") or canonicalize_url(result.get("url") or "")
+
+def _record_batch_in_store(batch: list, user_query: str, grants: list) -> None:
+    """Uloží výsledok analýzy dávky pre daný dopyt do indexu grantov (granty priradí stránkam podľa URL)."""
+    grants_by_page = {_canonical_url(res): [] for res in batch}
+    unattributed = False
+    for grant in grants:
+        page_grants = grants_by_page.get(canonicalize_url(grant.get("url") or ""))
+        if page_grants is None:
+            unattributed = True
+        else:
+            page_grants.append(grant)
+
+    for res in batch:
+        page_grants = grants_by_page[_canonical_url(res)]
+        # Ak LLM vrátil grant s URL mimo dávky, nevieme s istotou, ktorá stránka bola bez grantov
+        if page_grants or not unattributed:
+            grant_store.record_page(res, user_query, page_grants)
+
+def node_grant_analyst(state: GrantFinderState) -> dict:
+    logger.info("\n--- KROK 4: Analýza a extrakcia (Structured Output) ---")
+    results = state["ranked_results"]
+    user_query = state["user_query"]
+
+    if not results:
+        logger.info("Žiadne výsledky na analýzu.")
+        return {"structured_grants": []}
+
+    # Nezmenené, už analyzované stránky netreba posielať do LLM
+    known_grants = []
+    new_results = results
+    if grant_store is not None:
+        new_results = []
+        for res in results:
+            stored = grant_store.lookup(res, user_query)
+            if stored is None:
+                new_results.append(res)
+            else:
+                known_grants.extend(stored)
+        logger.info(f"Index grantov: {len(results) - len(new_results)} známych stránok, {len(new_results)} nových alebo zmenených.")
+
+    all_grants = list(known_grants)
+    if new_results:
+        all_grants.extend(_analyze_with_llm(new_results, user_query, state.get("region")))
+
+    # Reduce: zlúčenie a deduplikácia grantov zo všetkých dávok a z indexu
+    structured_grants_list = merge_grants(all_grants)
+    _log_llm_cache_stats()
     logger.info(f"Počet extrahovaných relevantných grantov: {len(structured_grants_list)}")
     return {"structured_grants": structured_grants_list}
 
-# --- Uzol 4: Report Generator ---
-def node_report_generator(state: GrantFinderState) -> dict:
-    logger.info("\n--- KROK 4: Generovanie reportu ---")
+def _analyze_with_llm(results: list, user_query: str, region: str = None) -> list:
+    """Map fáza: analyzuje výsledky v dávkach (paralelne) a vráti zoznam grantov (slovníky)."""
+    # Nakonfigurujeme LLM pre Structured Output
+    structured_llm_analyst = _llm_for("grant_analyst").with_structured_output(GrantAnalysis)
+
+    # Rozpočet tokenov: snippety sa orežú podľa relevancie, aby cena behu bola predvídateľná
+    limit = MAX_RESULTS_TO_ANALYZE if ANALYST_MODE == "single" else ANALYST_MAX_RESULTS
+    # Regionálne vetvy si rozpočet behu delia rovnakým dielom
+    token_budget = ANALYST_TOKEN_BUDGET // len(SEARCH_REGIONS) if region else ANALYST_TOKEN_BUDGET
+    packed = pack_results(
+        results[:limit], token_budget, LLM_MODEL,
+        min_tokens_per_result=ANALYST_MIN_TOKENS_PER_RESULT, header_tokens=RESULT_HEADER_TOKENS
+    )
+    if len(packed) < len(results[:limit]):
+        logger.info(f"Rozpočet {token_budget} tokenov pokryje {len(packed)} z {len(results[:limit])} výsledkov.")
+
+    # Map: každá dávka je samostatné (menšie) volanie, dávky bežia paralelne
+    batches = _split_into_batches(packed)
+    region_hint = f"Výsledky pochádzajú z vyhľadávania pre región {region}; región grantu však urči podľa obsahu.\n" if region else ""
+    offsets = [0]
+    for batch in batches[:-1]:
+        offsets.append(offsets[-1] + len(batch))
+    inputs = [
+        [
+            ("system", ANALYST_SYSTEM_PROMPT),
+            ("human", f"Pôvodná požiadavka: {user_query}\n{region_hint}\nAnalyzuj tieto výsledky vyhľadávania a extrahuj relevantné granty:\n\n{_format_results_for_llm(batch, offset)}")
+        ]
+        for batch, offset in zip(batches, offsets)
+    ]
+    logger.info(f"Analyzujem {sum(len(b) for b in batches)} výsledkov v {len(batches)} dávkach (režim: {ANALYST_MODE}).")
+
+    # Spustenie analýzy (return_exceptions=True, aby zlyhanie jednej dávky nezhodilo ostatné)
+    analysis_results = structured_llm_analyst.batch(
+        inputs,
+        config={"max_concurrency": ANALYST_MAX_CONCURRENCY},
+        return_exceptions=True
+    )
+
+    # Konverzia Pydantic objektov na slovníky (používame .dict() pre Pydantic V1 kompatibilitu).
+    # Dátum deadlinu sa určí lokálne z textu, schéma pre LLM ho neobsahuje.
+    all_grants = []
+    for batch, analysis_result in zip(batches, analysis_results):
+        if isinstance(analysis_result, Exception):
+            logger.error(f"Chyba pri analýze LLM alebo parsovaní výstupu: {analysis_result}", exc_info=analysis_result)
+            continue
+        batch_grants = [with_deadline_date(grant.dict()) for grant in analysis_result.grants]
+        if grant_store is not None:
+            _record_batch_in_store(batch, user_query, batch_grants)
+        all_grants.extend(batch_grants)
+    return all_grants
+
+# --- Regionálny režim (GRAPH_MODE=regional): fan-out a reduce ---
+def fan_out_regions(state: GrantFinderState) -> list:
+    """Podmienená hrana zo START: pre každý región jedna paralelná vetva (LangGraph Send API)."""
+    return [Send("region_search", {"user_query": state["user_query"], "region": region}) for region in SEARCH_REGIONS]
+
+def node_region_output(state: RegionState) -> dict:
+    """Posledný uzol regionálnej vetvy: granty vetvy pre reducer v hlavnom grafe."""
+    logger.info(f"Región {state['region']}: {len(state.get('structured_grants') or [])} grantov.")
+    return {"regional_grants": state.get("structured_grants") or []}
+
+def node_merge_regions(state: GrantFinderState) -> dict:
+    """Reduce: zlúči a deduplikuje granty zo všetkých regionálnych vetiev."""
+    logger.info("\n--- Zlúčenie regionálnych vetiev ---")
+    grants = merge_grants(state.get("regional_grants") or [])
+    logger.info(f"Počet grantov po zlúčení regiónov: {len(grants)}")
+    return {"structured_grants": grants}
+
+# --- Uzol 5: Report Generator ---
+def node_report_generator(state: GrantFinderState, writer: StreamWriter = None) -> dict:
+    logger.info("\n--- KROK 5: Generovanie reportu ---")
     grants = state["structured_grants"]
     user_query = state["user_query"]
+    # Časti reportu posielame volajúcemu hneď, ako vzniknú (LangGraph "custom" stream)
+    emit = (lambda text: writer({REPORT_CHUNK_KEY: text})) if writer else (lambda text: None)
 
     if not grants:
-        report = "Bohužiaľ, na základe aktuálnych informácií sa mi nepodarilo nájsť žiadne relevantné otvorené grantové výzvy pre vašu požiadavku. Odporúčam skúsiť širšie alebo inak formulované zadanie."
+        emit(NO_GRANTS_REPORT)
+        return {"final_report": NO_GRANTS_REPORT}
+
+    if REPORT_MODE != "prose":
+        # Predvolený režim: deterministická šablóna bez LLM volania
+        logger.info("Generujem report zo šablóny (REPORT_MODE=template).")
+        report = render_report(user_query, grants)
+        emit(report)
         return {"final_report": report}
 
     system_prompt = """
@@ -194,11 +531,14 @@ def node_report_generator(state: GrantFinderState) -> dict:
         ("human", human_prompt)
     ])
 
-    report_chain = prompt | llm | StrOutputParser()
-    report = report_chain.invoke({
+    report_chain = prompt | _llm_for("report_generator") | StrOutputParser()
+    chunks = []
+    for chunk in report_chain.stream({
         "user_query": user_query, 
         "grants_json": grants,
         "count": len(grants)
-    })
+    }):
+        chunks.append(chunk)
+        emit(chunk)
     
-    return {"final_report": report}
+    return {"final_report": "".join(chunks)}
@@ -0,0 +1,74 @@
+# src/agent/ranking.py
+import re
+import unicodedata
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Kľúčové slová typické pre stránky grantových výziev (SK aj EN)
+GRANT_KEYWORDS = [
+    "call", "deadline", "grant", "fellowship", "funding", "proposals", "eligibility",
+    "výzva", "uzávierka", "štipendium", "grantová", "podpora", "žiadosti",
+]
+KEYWORD_WEIGHT = 0.5    # Váha kľúčových slov voči termínom z požiadavky používateľa
+BM25_K1 = 1.5
+BM25_B = 0.75
+STEM_LENGTH = 6         # Max. dĺžka tokenu po jednoduchom "stemmingu"
+
+_WORD_RE = re.compile(r"\w+")
+_VOWELS = "aeiouy"
+
+def _stem(token: str) -> str:
+    """Hrubý stemming pre SK/EN: odstráni koncovú samohlásku a oreže token (výzva/výzvy/výzvu -> vyzv)."""
+    if len(token) > 4 and token[-1] in _VOWELS:
+        token = token[:-1]
+    return token[:STEM_LENGTH]
+
+def tokenize(text: str) -> List[str]:
+    """Rozdelí text na normalizované tokeny (bez diakritiky, malé písmená, stemming)."""
+    normalized = unicodedata.normalize("NFKD", (text or "").lower())
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return [_stem(token) for token in _WORD_RE.findall(normalized) if len(token) > 1]
+
+def bm25_scores(documents: List[List[str]], query_weights: Dict[str, float]) -> np.ndarray:
+    """Vypočíta BM25 skóre dokumentov (zoznamy tokenov) voči váženým termínom dopytu."""
+    if not documents or not query_weights:
+        return np.zeros(len(documents))
+
+    terms = list(query_weights)
+    term_index = {term: i for i, term in enumerate(terms)}
+
+    # Matica frekvencií termínov (dokumenty x termíny dopytu)
+    tf = np.zeros((len(documents), len(terms)), dtype=np.float64)
+    for row, tokens in enumerate(documents):
+        for token in tokens:
+            column = term_index.get(token)
+            if column is not None:
+                tf[row, column] += 1
+
+    doc_len = np.array([len(tokens) for tokens in documents], dtype=np.float64)
+    avg_len = doc_len.mean() or 1.0
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+    term_scores = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+    weights = np.array([query_weights[term] for term in terms])
+    return term_scores @ (idf * weights)
+
+def rank_results(results: List[Dict[str, Any]], user_query: str, top_k: int) -> List[Dict[str, Any]]:
+    """Zoradí výsledky podľa BM25 relevancie k požiadavke a vráti top_k (so skóre v kľúči "relevance")."""
+    query_weights: Dict[str, float] = {}
+    for keyword in GRANT_KEYWORDS:
+        for token in tokenize(keyword):
+            query_weights[token] = KEYWORD_WEIGHT
+    # Termíny z požiadavky používateľa majú prednosť pred všeobecnými kľúčovými slovami
+    for token in tokenize(user_query):
+        query_weights[token] = 1.0
+
+    documents = [tokenize(f"{res.get('title') or ''} {res.get('content') or ''}") for res in results]
+    scores = bm25_scores(documents, query_weights)
+
+    # Stabilné zoradenie: pri zhode skóre zostáva pôvodné poradie vyhľadávača
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [{**results[i], "relevance": round(float(scores[i]), 4)} for i in order]
@@ -0,0 +1,92 @@
+# src/agent/report.py
+import datetime
+from typing import Any, Dict, List
+
+from src.agent.deadlines import grant_deadline
+
+# Poradie regiónov v reporte (ostatné regióny nasledujú abecedne)
+REGION_ORDER = ["Slovakia", "EU", "Global"]
+REGION_LABELS = {"Slovakia": "Slovensko", "EU": "Európska únia", "Global": "Globálne"}
+UNKNOWN_DEADLINE = "Neznámy"
+
+NO_GRANTS_REPORT = "Bohužiaľ, na základe aktuálnych informácií sa mi nepodarilo nájsť žiadne relevantné otvorené grantové výzvy pre vašu požiadavku. Odporúčam skúsiť širšie alebo inak formulované zadanie."
+REPORT_FOOTER = "*Poznámka: Odporúčam vždy skontrolovať detaily a podmienky priamo na oficiálnej stránke výzvy.*"
+
+def _region_sort_key(region: str) -> tuple:
+    if region in REGION_ORDER:
+        return (REGION_ORDER.index(region), "")
+    return (len(REGION_ORDER), region.lower())
+
+def _deadline_sort_key(grant: Dict[str, Any]) -> tuple:
+    """Granty so známym dátumom idú prvé (od najbližšieho), neznáme na koniec."""
+    date = grant_deadline(grant)
+    return (date is None, date or datetime.date.max, (grant.get("title") or "").lower())
+
+def _count_phrase(count: int) -> str:
+    """Slovenské skloňovanie počtu výziev."""
+    if count == 1:
+        return "1 relevantnú otvorenú výzvu"
+    if 2 <= count <= 4:
+        return f"{count} relevantné otvorené výzvy"
+    return f"{count} relevantných otvorených výziev"
+
+def _render_grant(grant: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"### {grant.get('title') or 'Bez názvu'}",
+        f"*   **Región:** {grant.get('region') or 'Neznámy'}",
+        f"*   **Poskytovateľ:** {grant.get('funding_body') or 'Neznámy'}",
+        f"*   **Deadline:** 🗓️ {grant.get('deadline') or UNKNOWN_DEADLINE}",
+        f"*   **Zameranie a relevancia:** {grant.get('relevance_explanation') or ''}".rstrip(),
+        f"*   **Odkaz:** {grant.get('url') or ''}".rstrip(),
+    ])
+
+def render_report(user_query: str, grants: List[Dict[str, Any]]) -> str:
+    """Deterministicky vytvorí Markdown report (bez LLM), zoskupený podľa regiónu a zoradený podľa deadlinu."""
+    if not grants:
+        return NO_GRANTS_REPORT
+
+    by_region: Dict[str, List[Dict[str, Any]]] = {}
+    for grant in grants:
+        by_region.setdefault(grant.get("region") or "Ostatné", []).append(grant)
+
+    lines = [
+        f'# Prehľad grantových príležitostí pre: "{user_query}"',
+        "",
+        f"Našiel som {_count_phrase(len(grants))}. Tu je ich podrobný prehľad:",
+        "",
+    ]
+    for region in sorted(by_region, key=_region_sort_key):
+        lines += ["---", "", f"## {REGION_LABELS.get(region, region)}", ""]
+        for grant in sorted(by_region[region], key=_deadline_sort_key):
+            lines += [_render_grant(grant), ""]
+
+    lines += ["---", REPORT_FOOTER]
+    return "\n".join(lines)
+
+FIELD_LABELS = {"title": "Názov", "deadline": "Deadline", "funding_body": "Poskytovateľ", "region": "Región"}
+
+def render_delta_report(user_query: str, new: List[Dict[str, Any]], changed: List[Dict[str, Any]]) -> str:
+    """Report iba so zmenami od poslednej kontroly (nové výzvy a zmenené polia existujúcich).
+
+    `changed` obsahuje položky `{"grant": {...}, "changes": {pole: [stará, nová]}}`.
+    """
+    lines = [
+        f'# Novinky v grantových výzvach pre: "{user_query}"',
+        "",
+        f"Od poslednej kontroly: nové výzvy {len(new)}, zmenené výzvy {len(changed)}.",
+        "",
+    ]
+    if new:
+        lines += ["---", "", "## 🆕 Nové výzvy", ""]
+        for grant in sorted(new, key=_deadline_sort_key):
+            lines += [_render_grant(grant), ""]
+    if changed:
+        lines += ["---", "", "## ✏️ Zmenené výzvy", ""]
+        for item in sorted(changed, key=lambda item: _deadline_sort_key(item["grant"])):
+            lines.append(_render_grant(item["grant"]))
+            for field, (old, new_value) in item["changes"].items():
+                lines.append(f"*   **Zmena – {FIELD_LABELS.get(field, field)}:** {old or UNKNOWN_DEADLINE} → {new_value or UNKNOWN_DEADLINE}")
+            lines.append("")
+
+    lines += ["---", REPORT_FOOTER]
+    return "\n".join(lines)
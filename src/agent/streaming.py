@@ -0,0 +1,38 @@
+# src/agent/streaming.py
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+
+# Kľúč, pod ktorým Report Generator posiela časti reportu cez LangGraph "custom" stream
+REPORT_CHUNK_KEY = "report_chunk"
+
+def _report_chunk(chunk: Any) -> Optional[str]:
+    if isinstance(chunk, dict):
+        return chunk.get(REPORT_CHUNK_KEY)
+    return None
+
+def stream_report(app, initial_state: Optional[dict], config: Optional[dict] = None) -> Iterator[Tuple[str, Any]]:
+    """Spustí graf a priebežne vracia časti reportu.
+
+    Generuje dvojice `("token", text)` hneď, ako ich Report Generator vyprodukuje,
+    a na záver `("state", final_state)` s kompletným stavom grafu.
+    """
+    final_state: dict = {}
+    for mode, chunk in app.stream(initial_state, config, stream_mode=["values", "custom"]):
+        if mode == "values":
+            final_state = chunk
+        else:
+            text = _report_chunk(chunk)
+            if text:
+                yield "token", text
+    yield "state", final_state
+
+async def astream_report(app, initial_state: Optional[dict], config: Optional[dict] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """Asynchrónna verzia `stream_report` (pre službu a ďalších volajúcich)."""
+    final_state: dict = {}
+    async for mode, chunk in app.astream(initial_state, config, stream_mode=["values", "custom"]):
+        if mode == "values":
+            final_state = chunk
+        else:
+            text = _report_chunk(chunk)
+            if text:
+                yield "token", text
+    yield "state", final_state
@@ -0,0 +1,179 @@
+# src/agent/tracing.py
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.types import StreamWriter
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class NodeMetrics:
+    """Metriky jedného behu jedného uzla grafu."""
+    node: str
+    thread_id: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    wall_time_seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_chars: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    search_calls: int = 0
+    search_latency_seconds: float = 0.0
+    result_counts: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def __post_init__(self):
+        # Uzly volajú LLM a vyhľadávanie paralelne z viacerých vlákien
+        self._lock = threading.Lock()
+
+    def add(self, **increments: float) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["wall_time_seconds"] = round(self.wall_time_seconds, 4)
+        data["search_latency_seconds"] = round(self.search_latency_seconds, 4)
+        return data
+
+_current_metrics: ContextVar[Optional[NodeMetrics]] = ContextVar("grant_finder_node_metrics", default=None)
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Zbiera veľkosť promptov a spotrebu tokenov LLM volaní do metrík aktuálneho uzla."""
+
+    def __init__(self, metrics: NodeMetrics):
+        self.metrics = metrics
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        self.metrics.add(llm_calls=1, prompt_chars=chars)
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        self.metrics.add(llm_calls=1, prompt_chars=sum(len(prompt) for prompt in prompts))
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        # Odpovede z cache nemajú llm_output, takže počítame iba skutočne minuté tokeny
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        self.metrics.add(
+            prompt_tokens=usage.get("prompt_tokens") or 0,
+            completion_tokens=usage.get("completion_tokens") or 0
+        )
+
+# Handler v tejto premennej LangChain automaticky pridá ku každému volaniu LLM v danom kontexte
+_metrics_handler: ContextVar[Optional[MetricsCallbackHandler]] = ContextVar("grant_finder_metrics_handler", default=None)
+register_configure_hook(_metrics_handler, inheritable=True)
+
+def record_search(latency_seconds: float) -> None:
+    """Zaznamená jedno volanie vyhľadávania do metrík aktuálneho uzla (ak sa meria)."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.add(search_calls=1, search_latency_seconds=latency_seconds)
+
+class MetricsExporter:
+    """Zapisuje metriky uzlov ako JSON lines a kumulatívne ako Prometheus textfile (OpenMetrics)."""
+
+    def __init__(self, jsonl_path: str, prom_path: str):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+        for path in (jsonl_path, prom_path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def export(self, metrics: NodeMetrics) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(metrics.node, {
+                "runs": 0, "errors": 0, "duration_seconds": 0.0, "last_duration_seconds": 0.0,
+                "llm_calls": 0, "prompt_chars": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "search_calls": 0, "search_latency_seconds": 0.0, "results": 0,
+            })
+            totals["runs"] += 1
+            totals["errors"] += 1 if metrics.error else 0
+            totals["duration_seconds"] += metrics.wall_time_seconds
+            totals["last_duration_seconds"] = metrics.wall_time_seconds
+            for name in ("llm_calls", "prompt_chars", "prompt_tokens", "completion_tokens", "search_calls", "search_latency_seconds"):
+                totals[name] += getattr(metrics, name)
+            totals["results"] += sum(metrics.result_counts.values())
+
+            try:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(metrics.to_dict(), ensure_ascii=False) + "\n")
+                self._write_prometheus()
+            except OSError as e:
+                logger.warning(f"Nemôžem zapísať metriky: {e}")
+
+    def _write_prometheus(self) -> None:
+        families = [
+            ("grant_finder_node_runs", "counter", "Počet behov uzla", "runs"),
+            ("grant_finder_node_errors", "counter", "Počet zlyhaných behov uzla", "errors"),
+            ("grant_finder_node_duration_seconds", "counter", "Celkový čas behu uzla", "duration_seconds"),
+            ("grant_finder_node_last_duration_seconds", "gauge", "Čas posledného behu uzla", "last_duration_seconds"),
+            ("grant_finder_llm_calls", "counter", "Počet LLM volaní", "llm_calls"),
+            ("grant_finder_llm_prompt_chars", "counter", "Veľkosť promptov v znakoch", "prompt_chars"),
+            ("grant_finder_llm_prompt_tokens", "counter", "Spotrebované prompt tokeny", "prompt_tokens"),
+            ("grant_finder_llm_completion_tokens", "counter", "Spotrebované completion tokeny", "completion_tokens"),
+            ("grant_finder_search_calls", "counter", "Počet volaní vyhľadávania", "search_calls"),
+            ("grant_finder_search_latency_seconds", "counter", "Celkový čas volaní vyhľadávania", "search_latency_seconds"),
+            ("grant_finder_node_results", "counter", "Počet položiek vo výstupe uzla", "results"),
+        ]
+        lines = []
+        for name, metric_type, help_text, key in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            suffix = "_total" if metric_type == "counter" else ""
+            for node, totals in sorted(self._totals.items()):
+                lines.append(f'{name}{suffix}{{node="{node}"}} {totals[key]:g}')
+        lines.append("# EOF")
+
+        # Atomický zápis, aby node_exporter nikdy nečítal rozpísaný súbor
+        tmp_path = f"{self.prom_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prom_path)
+
+def traced_node(name: str, fn: Callable[[dict], dict], exporter: MetricsExporter) -> Callable:
+    """Obalí uzol grafu meraním času, LLM tokenov, vyhľadávaní a veľkosti výstupu."""
+
+    # LangGraph odovzdá `writer` iba uzlom, ktoré ho majú v signatúre, preto ho preposielame len vtedy
+    forwards_writer = "writer" in inspect.signature(fn).parameters
+
+    def node(state: dict, config: Optional[dict] = None, writer: StreamWriter = None) -> dict:
+        configurable = (config or {}).get("configurable", {})
+        metrics = NodeMetrics(node=name, thread_id=configurable.get("thread_id"))
+        metrics_token = _current_metrics.set(metrics)
+        handler_token = _metrics_handler.set(MetricsCallbackHandler(metrics))
+        start = time.perf_counter()
+        try:
+            output = fn(state, writer=writer) if forwards_writer else fn(state)
+            metrics.result_counts = {
+                key: len(value) for key, value in (output or {}).items() if isinstance(value, (list, dict))
+            }
+            return output
+        except Exception as e:
+            metrics.error = repr(e)
+            raise
+        finally:
+            metrics.wall_time_seconds = time.perf_counter() - start
+            _metrics_handler.reset(handler_token)
+            _current_metrics.reset(metrics_token)
+            exporter.export(metrics)
+            logger.info(
+                f"⏱️ {name}: {metrics.wall_time_seconds:.2f}s, LLM volaní {metrics.llm_calls} "
+                f"({metrics.prompt_tokens}+{metrics.completion_tokens} tokenov), vyhľadávaní {metrics.search_calls}"
+            )
+
+    node.__name__ = getattr(fn, "__name__", name)
+    return node
@@ -0,0 +1,121 @@
+# src/batch.py
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+# Pridanie koreňového adresára do PYTHONPATH pre správne importy
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.config import BATCH_WORKERS
+from src.logger import setup_logger
+
+# Konfigurácia (setup_logger) prebehne v main(), aby import modulu nemal vedľajšie efekty
+logger = logging.getLogger("Batch")
+
+def load_queries(input_path: str) -> list:
+    """Načíta dopyty z JSONL súboru. Každý riadok: {"id": ..., "query": "..."} (id je voliteľné)."""
+    queries = []
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️ Preskakujem neplatný riadok {line_number}: {e}")
+                continue
+            query = (record.get("query") or "").strip()
+            if len(query) < 5:
+                logger.warning(f"⚠️ Preskakujem riadok {line_number}: dopyt chýba alebo je príliš krátky.")
+                continue
+            queries.append({"id": str(record.get("id", line_number)), "query": query})
+    return queries
+
+def load_done_ids(output_path: str) -> set:
+    """Vráti ID dopytov, ktoré sú vo výstupnom súbore úspešne dokončené (pre obnovenie po páde)."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Neúplný posledný riadok po páde procesu ignorujeme
+                continue
+            if record.get("status") == "ok":
+                done.add(str(record.get("id")))
+    return done
+
+async def run_batch(app, input_path: str, output_path: str, workers: int = BATCH_WORKERS) -> dict:
+    """Spustí všetky nedokončené dopyty súbežne nad jedným skompilovaným grafom.
+
+    Každý výsledok sa zapíše ako samostatný riadok do výstupného JSONL súboru hneď,
+    ako je hotový, takže opätovné spustenie pokračuje tam, kde predchádzajúce skončilo.
+    """
+    queries = load_queries(input_path)
+    done_ids = load_done_ids(output_path)
+    pending = [item for item in queries if item["id"] not in done_ids]
+    logger.info(f"📋 Dopytov spolu: {len(queries)}, hotových: {len(queries) - len(pending)}, na spracovanie: {len(pending)}")
+
+    semaphore = asyncio.Semaphore(max(1, workers))
+    write_lock = asyncio.Lock()
+    stats = {"ok": 0, "error": 0, "skipped": len(queries) - len(pending)}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def process(item: dict) -> None:
+            async with semaphore:
+                logger.info(f"🔍 [{item['id']}] {item['query']}")
+                try:
+                    final_state = await app.ainvoke({"user_query": item["query"]})
+                    record = {
+                        "id": item["id"],
+                        "query": item["query"],
+                        "status": "ok",
+                        "structured_grants": final_state.get("structured_grants", []),
+                        "final_report": final_state.get("final_report", ""),
+                    }
+                except Exception as e:
+                    logger.error(f"❌ [{item['id']}] Chyba počas behu agenta: {e}", exc_info=True)
+                    record = {"id": item["id"], "query": item["query"], "status": "error", "error": str(e)}
+
+            async with write_lock:
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                stats[record["status"]] += 1
+
+        await asyncio.gather(*(process(item) for item in pending))
+
+    return stats
+
+def main():
+    # Force UTF-8 encoding for Windows
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    sys.stdout.reconfigure(encoding='utf-8')
+    setup_logger("Batch")
+
+    parser = argparse.ArgumentParser(description="Dávkové spustenie Grant Finder agenta nad dopytmi z JSONL súboru.")
+    parser.add_argument("input", help="Vstupný JSONL súbor (riadky {\"id\": ..., \"query\": ...})")
+    parser.add_argument("output", help="Výstupný JSONL súbor (dopĺňa sa, hotové ID sa preskočia)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help=f"Počet súbežne spracovaných dopytov (predvolene {BATCH_WORKERS})")
+    args = parser.parse_args()
+
+    from src.agent.graph import create_graph
+
+    # Graf (a nástroje) kompilujeme iba raz pre celú dávku
+    try:
+        app = create_graph()
+    except ValueError as e:
+        logger.error(f"❌ Chyba konfigurácie: {e}")
+        sys.exit(1)
+
+    stats = asyncio.run(run_batch(app, args.input, args.output, args.workers))
+    logger.info(f"\n✅ Dávka dokončená: {stats['ok']} úspešných, {stats['error']} chybných, {stats['skipped']} preskočených.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# src/cache.py
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+class SQLiteTTLCache:
+    """Jednoduchá perzistentná key-value cache v SQLite s TTL a LRU vyraďovaním."""
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Cache sa používa aj z worker vlákien (paralelné vyhľadávanie), preto zámok
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Vytvorí stabilný kľúč (SHA-256) z textových častí."""
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Vráti uloženú hodnotu alebo None (chýba alebo expirovala)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Uloží hodnotu (JSON serializovateľnú) a v prípade potreby vyradí najstaršie záznamy."""
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            # LRU: ponecháme iba max_entries naposledy použitých záznamov
+            self._conn.execute(
+                """
+                DELETE FROM entries WHERE key IN (
+                    SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Vymaže všetky záznamy."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Vráti štatistiku zásahov (hits) a výpadkov (misses)."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+# --- Cache pre Tavily vyhľadávanie ---
+
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+def normalize_query(query: str) -> str:
+    """Normalizuje dopyt pre cache kľúč (veľkosť písmen, interpunkcia, medzery, roky).
+
+    Optimizer generuje takmer zhodné dopyty, ktoré sa líšia len formou
+    ("APVV výzva 2025/2026" vs. "apvv  výzva 2025 2026"), preto roky vynechávame.
+    """
+    text = _YEAR_RE.sub(" ", query.lower())
+    text = _NON_WORD_RE.sub(" ", text)
+    return " ".join(text.split())
+
+class CachedSearchTool:
+    """Obal okolo vyhľadávacieho nástroja, ktorý výsledky ukladá do perzistentnej cache."""
+
+    def __init__(self, tool: Any, cache: SQLiteTTLCache):
+        self.tool = tool
+        self.cache = cache
+
+    def invoke(self, tool_input: dict) -> Any:
+        query = tool_input["query"]
+        key = SQLiteTTLCache.make_key("search", normalize_query(query))
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"Cache hit pre dopyt '{query}'")
+            return cached
+
+        results = self.tool.invoke(tool_input)
+        # Ukladáme iba úspešné odpovede (Tavily pri chybe vracia textový popis výnimky)
+        if isinstance(results, list):
+            self.cache.set(key, results)
+        return results
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+# --- Cache pre odpovede LLM ---
+
+# Kľúč v generation_info odpovedí vrátených z LLM cache
+CACHE_HIT_KEY = "grant_finder_cache_hit"
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain cache pre ChatOpenAI uložená v SQLite (s TTL a LRU vyraďovaním).
+
+    Kľúč tvorí `llm_string` (model, parametre a naviazaná schéma pre structured output)
+    a serializované správy promptu, takže pri teplote 0 je odpoveď znovupoužiteľná.
+    """
+
+    def __init__(self, cache: SQLiteTTLCache):
+        self.cache = cache
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        cached = self.cache.get(SQLiteTTLCache.make_key("llm", llm_string, prompt))
+        if cached is None:
+            return None
+        try:
+            generations = [loads(generation) for generation in cached]
+        except Exception as e:
+            # Nekompatibilný záznam (napr. po aktualizácii knižníc) berieme ako výpadok
+            logger.warning(f"Nemôžem deserializovať záznam z LLM cache: {e}")
+            return None
+        # Značka pre callbacky: odpoveď z cache nie je volanie API (nečerpá limit, nehovorí o dostupnosti)
+        for generation in generations:
+            generation.generation_info = {**(generation.generation_info or {}), CACHE_HIT_KEY: True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.cache.set(
+            SQLiteTTLCache.make_key("llm", llm_string, prompt),
+            [dumps(generation) for generation in return_val]
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear()
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
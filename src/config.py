@@ -1,28 +1,195 @@
 # src/config.py
 import os
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
+
+# Ťažké závislosti (langchain_openai, langchain_community, langgraph) sa importujú až vo funkciách,
+# ktoré ich potrebujú; import konfigurácie (napr. pri --help alebo chybe vstupu) tak trvá milisekundy
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from src.resilience import LLMRateLimiter
 
 # Načítanie environmentálnych premenných z .env súboru
 # Hľadá .env v koreňovom adresári projektu
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(PROJECT_ROOT, "cache")
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Načíta boolean prepínač z environmentálnej premennej (1/true/yes/on)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 # Konštanty
 LLM_MODEL = "gpt-4o"
 LLM_TEMPERATURE = 0
 TAVILY_MAX_RESULTS = 10
+# Paralelné vyhľadávanie (Search Executor)
+SEARCH_MAX_CONCURRENCY = 6      # Max. počet súčasne bežiacich Tavily dopytov
+SEARCH_TIMEOUT_SECONDS = 30     # Timeout pre jeden vyhľadávací dopyt
+# Perzistentná cache odpovedí LLM (pri LLM_TEMPERATURE = 0 sú odpovede deterministické)
+LLM_CACHE_ENABLED = _env_flag("LLM_CACHE_ENABLED", True)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 5000
+# Uzly, ktoré cache obchádzajú (napr. LLM_CACHE_BYPASS=grant_analyst,report_generator)
+LLM_CACHE_BYPASS_NODES = {name.strip() for name in os.getenv("LLM_CACHE_BYPASS", "").split(",") if name.strip()}
+# Perzistentná cache výsledkov vyhľadávania
+SEARCH_CACHE_ENABLED = _env_flag("SEARCH_CACHE_ENABLED", True)
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "search_cache.sqlite"))
+SEARCH_CACHE_TTL_SECONDS = 24 * 60 * 60
+SEARCH_CACHE_MAX_ENTRIES = 2000
+# Adaptívne vyhľadávanie: prvé kolo dopytov beží celé naraz; pri nedostatku silných kandidátov
+# Query Optimizer vygeneruje doplňujúce dopyty (max. SEARCH_MAX_ROUNDS kôl). Tie bežia vo vlnách
+# a po dostatku silných kandidátov sa ďalšie nespúšťajú (menej volaní API za cenu ďalšej vlny latencie)
+SEARCH_WAVE_SIZE = 3
+SEARCH_MIN_SCORE = 0.5           # Tavily skóre, od ktorého je výsledok "silný" kandidát
+SEARCH_TARGET_CANDIDATES = 15    # Po dosiahnutí sa zvyšné dopyty kola preskočia
+SEARCH_MIN_CANDIDATES = 6        # Pod touto hranicou nasleduje doplňujúce kolo
+SEARCH_MAX_ROUNDS = int(os.getenv("SEARCH_MAX_ROUNDS", "2"))
+# Tvar grafu: "linear" = jedna spoločná vetva, "regional" = paralelné vetvy pre každý región (Send API)
+GRAPH_MODE = os.getenv("GRAPH_MODE", "linear")
+SEARCH_REGIONS = ["Slovakia", "EU", "Global"]
+REGION_RANKER_TOP_K = 10         # Top-k pre analýzu v jednej regionálnej vetve
+# Výsledky, ktorých všetky uvedené termíny podania už uplynuli, sa pred analýzou zahodia (lokálne, bez LLM)
+DEADLINE_PREFILTER_ENABLED = _env_flag("DEADLINE_PREFILTER_ENABLED", True)
+# Lokálne zoradenie výsledkov (Result Ranker) - počet výsledkov, ktoré postúpia do LLM analýzy
+RANKER_TOP_K = 24
+# Perzistentný index analyzovaných stránok a grantov (nezmenené stránky sa neanalyzujú znova)
+GRANT_STORE_ENABLED = _env_flag("GRANT_STORE_ENABLED", True)
+GRANT_STORE_PATH = os.getenv("GRANT_STORE_PATH", os.path.join(CACHE_DIR, "grants.sqlite"))
+GRANT_STORE_TTL_SECONDS = 14 * 24 * 60 * 60
+# Analýza grantov (Grant Analyst)
+# "map_reduce" = paralelné dávky nad všetkými výsledkami, "single" = jedno volanie nad prvými N výsledkami
+ANALYST_MODE = os.getenv("ANALYST_MODE", "map_reduce")
+ANALYST_BATCH_SIZE = 8          # Počet výsledkov v jednej dávke
+ANALYST_MAX_CONCURRENCY = 4     # Max. počet súčasne bežiacich LLM volaní
+ANALYST_MAX_RESULTS = 60        # Horný limit výsledkov pre map-reduce režim
+MAX_RESULTS_TO_ANALYZE = 15     # Limit výsledkov pre režim "single"
+# Rozpočet tokenov pre snippety všetkých výsledkov v analýze (jeden beh), delí sa podľa relevancie
+ANALYST_TOKEN_BUDGET = int(os.getenv("ANALYST_TOKEN_BUDGET", "6000"))
+ANALYST_MIN_TOKENS_PER_RESULT = 40
+# Generovanie reportu: "template" = lokálna šablóna (bez LLM), "prose" = report napíše LLM
+REPORT_MODE = os.getenv("REPORT_MODE", "template")
+# Metriky uzlov grafu (JSON lines + Prometheus textfile)
+METRICS_ENABLED = _env_flag("METRICS_ENABLED", True)
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(PROJECT_ROOT, "logs"))
+METRICS_JSONL_PATH = os.path.join(METRICS_DIR, "metrics.jsonl")
+METRICS_PROM_PATH = os.path.join(METRICS_DIR, "grant_finder.prom")
+# Rate limiting, opakovanie pri 429/5xx a circuit breaker (zdieľané v rámci procesu)
+RATE_LIMIT_ENABLED = _env_flag("RATE_LIMIT_ENABLED", True)
+OPENAI_REQUESTS_PER_SECOND = float(os.getenv("OPENAI_REQUESTS_PER_SECOND", "5"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000"))
+TAVILY_REQUESTS_PER_SECOND = float(os.getenv("TAVILY_REQUESTS_PER_SECOND", "2"))
+LLM_MAX_RETRIES = 5             # Opakovania v klientovi openai (exponenciálny backoff, rešpektuje Retry-After)
+SEARCH_MAX_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 8.0
+CIRCUIT_FAILURE_THRESHOLD = 5   # Po koľkých zlyhaniach po sebe sa upstream prestane volať
+CIRCUIT_RESET_SECONDS = 30      # Ako dlho je obvod otvorený pred skúšobným volaním
+# Checkpointy behov grafu (SQLite) - neúspešný beh možno zopakovať od posledného dokončeného uzla
+CHECKPOINT_ENABLED = _env_flag("CHECKPOINT_ENABLED", False)
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(CACHE_DIR, "checkpoints.sqlite"))
+# Dávkový režim (src/batch.py) - počet súbežne spracovaných dopytov
+BATCH_WORKERS = 4
+# Watch režim (src/watch.py) - posledné známe granty sledovaných dopytov a interval kontrol
+WATCH_STORE_PATH = os.getenv("WATCH_STORE_PATH", os.path.join(CACHE_DIR, "watch.sqlite"))
+WATCH_INTERVAL_SECONDS = 24 * 60 * 60
+# Režim služby (src/server.py)
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_WORKERS = 4             # Počet súbežne bežiacich behov grafu
+SERVICE_QUEUE_SIZE = 32         # Max. počet čakajúcich požiadaviek, potom služba vracia 503
+
+_llm_rate_limiter = None
+_search_rate_limiter = None
+
+def _get_llm_rate_limiter() -> "LLMRateLimiter":
+    # Jeden limiter pre celý proces, aby sa kvóta delila medzi všetky inštancie LLM a súbežné behy
+    global _llm_rate_limiter
+    if _llm_rate_limiter is None:
+        from src.resilience import CircuitBreaker, LLMRateLimiter, TokenBucket
+
+        _llm_rate_limiter = LLMRateLimiter(
+            requests=TokenBucket(OPENAI_REQUESTS_PER_SECOND, max(1.0, OPENAI_REQUESTS_PER_SECOND)),
+            tokens=TokenBucket(OPENAI_TOKENS_PER_MINUTE / 60, OPENAI_TOKENS_PER_MINUTE),
+            breaker=CircuitBreaker("OpenAI", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS),
+        )
+    return _llm_rate_limiter
+
+def _get_search_rate_limiter() -> tuple:
+    global _search_rate_limiter
+    if _search_rate_limiter is None:
+        from src.resilience import CircuitBreaker, TokenBucket
 
-def get_llm() -> ChatOpenAI:
-    """Vráti nakonfigurovanú inštanciu ChatOpenAI LLM."""
+        _search_rate_limiter = (
+            TokenBucket(TAVILY_REQUESTS_PER_SECOND, max(1.0, TAVILY_REQUESTS_PER_SECOND)),
+            CircuitBreaker("Tavily", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS),
+        )
+    return _search_rate_limiter
+
+def get_llm() -> "ChatOpenAI":
+    """Vráti nakonfigurovanú inštanciu ChatOpenAI LLM (voliteľne s perzistentnou cache)."""
     if not os.getenv("OPENAI_API_KEY"):
         # Vyvoláme výnimku, ktorú zachytí main.py
         raise ValueError("Nemôžem inicializovať LLM: OPENAI_API_KEY chýba v .env súbore alebo nie je nastavený.")
-    return ChatOpenAI(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
+    from langchain_openai import ChatOpenAI
+    from src.cache import SQLiteLLMCache, SQLiteTTLCache
+    from src.resilience import LLMResilienceCallback
+
+    cache = None
+    if LLM_CACHE_ENABLED:
+        cache = SQLiteLLMCache(SQLiteTTLCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES))
+    if not RATE_LIMIT_ENABLED:
+        return ChatOpenAI(model=LLM_MODEL, temperature=LLM_TEMPERATURE, cache=cache, max_retries=LLM_MAX_RETRIES)
+    rate_limiter = _get_llm_rate_limiter()
+    # stream_usage: aj streamovaný report (REPORT_MODE=prose) vráti spotrebu tokenov pre limiter
+    return ChatOpenAI(
+        model=LLM_MODEL, temperature=LLM_TEMPERATURE, cache=cache, max_retries=LLM_MAX_RETRIES,
+        stream_usage=True, rate_limiter=rate_limiter, callbacks=[LLMResilienceCallback(rate_limiter)]
+    )
+
+def get_grant_store():
+    """Vráti perzistentný index grantov alebo None, ak je vypnutý."""
+    if not GRANT_STORE_ENABLED:
+        return None
+    from src.agent.grant_store import GrantStore
 
-def get_search_tool() -> TavilySearchResults:
-    """Vráti nakonfigurovanú inštanciu Tavily Search nástroja."""
+    return GrantStore(GRANT_STORE_PATH, GRANT_STORE_TTL_SECONDS)
+
+def get_checkpointer():
+    """Vráti SQLite checkpointer pre LangGraph (voliteľná závislosť langgraph-checkpoint-sqlite)."""
+    try:
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        raise ValueError("Checkpointy vyžadujú balík langgraph-checkpoint-sqlite (pip install langgraph-checkpoint-sqlite).")
+    directory = os.path.dirname(CHECKPOINT_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Graf pri ainvoke/stream spúšťa synchrónne uzly vo vláknach, preto check_same_thread=False
+    return SqliteSaver(sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False))
+
+def get_search_tool():
+    """Vráti nakonfigurovanú inštanciu Tavily Search nástroja (voliteľne obalenú cache)."""
     if not os.getenv("TAVILY_API_KEY"):
         # Vyvoláme výnimku, ktorú zachytí main.py
         raise ValueError("Nemôžem inicializovať Tavily: TAVILY_API_KEY chýba v .env súbore alebo nie je nastavený.")
-    return TavilySearchResults(max_results=TAVILY_MAX_RESULTS)
+    from langchain_community.tools.tavily_search import TavilySearchResults
+    from src.cache import CachedSearchTool, SQLiteTTLCache
+    from src.resilience import ResilientSearchTool
+
+    tool = TavilySearchResults(max_results=TAVILY_MAX_RESULTS)
+    if RATE_LIMIT_ENABLED:
+        limiter, breaker = _get_search_rate_limiter()
+        tool = ResilientSearchTool(
+            tool, limiter, breaker, SEARCH_MAX_RETRIES, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS
+        )
+    # Cache je navrchu, aby zásahy do cache nečerpali limit ani nečakali na backoff
+    if not SEARCH_CACHE_ENABLED:
+        return tool
+    cache = SQLiteTTLCache(SEARCH_CACHE_PATH, SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES)
+    return CachedSearchTool(tool, cache)
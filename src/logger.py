@@ -34,6 +34,8 @@ def setup_logger(name="GrantFinderAgent"):
     # Console Handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(console_formatter)
+    # Záznamy s extra={"file_only": True} (napr. report, ktorý už bol vypísaný po tokenoch) idú iba do súboru
+    console_handler.addFilter(lambda record: not getattr(record, "file_only", False))
     logger.addHandler(console_handler)
 
     # File Handler
@@ -4,17 +4,39 @@ import sys
 # Force UTF-8 encoding for Windows
 os.environ['PYTHONIOENCODING'] = 'utf-8'
 sys.stdout.reconfigure(encoding='utf-8')
+import argparse
 import logging
+import uuid
 
 # Pridanie koreňového adresára do PYTHONPATH pre správne importy
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
 from src.agent.graph import create_graph
+from src.agent.streaming import stream_report
+from src.config import CHECKPOINT_ENABLED, get_checkpointer
 from src.logger import setup_logger
 
-def run_agent(query: str):
-    """Spustí Grant Finder agenta pre zadaný dopyt."""
+def _print_token(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+def _is_valid_query(query: str) -> bool:
+    return bool(query) and len(query.strip()) >= 5
+
+def run_agent(query: str, on_token=None, run_id: str = None):
+    """Spustí Grant Finder agenta pre zadaný dopyt.
+
+    Report sa vypisuje priebežne, ako vzniká. Volajúci môže namiesto výpisu
+    na konzolu odovzdať vlastný `on_token(text)` callback.
+
+    S checkpointmi (`run_id` alebo CHECKPOINT_ENABLED) sa stav ukladá po každom uzle.
+    Opakované spustenie s rovnakým `run_id` pokračuje od uzla, ktorý zlyhal.
+    """
+    on_token = on_token or _print_token
+    checkpointing = CHECKPOINT_ENABLED or run_id is not None
+    if checkpointing and not run_id:
+        run_id = uuid.uuid4().hex[:12]
     
     # 1. Nastavenie loggera (musí byť prvé)
     try:
@@ -24,20 +46,27 @@ def run_agent(query: str):
         print(f"❌ Kritická chyba: Nepodarilo sa nastaviť logger: {e}")
         return
 
-    # 2. Validácia vstupu
-    if not query or len(query.strip()) < 5:
+    # 2. Validácia vstupu (pri obnove behu sa dopyt načíta z checkpointu)
+    if not run_id and not _is_valid_query(query):
         # Použijeme logger.error pre konzistentnosť, ale keďže logger vypisuje na konzolu, je to viditeľné
         logger.error("❌ Chyba vstupu: Zadajte prosím konkrétnejší dopyt (min. 5 znakov)")
         return
         
     logger.info(f"🔍 Spúšťam Grant Finder Agenta")
-    logger.info(f"📝 Vaša požiadavka: '{query}'")
     
     # 3. Inicializácia agenta (Grafu a Nástrojov)
+    checkpointer = None
+    if checkpointing:
+        try:
+            checkpointer = get_checkpointer()
+        except ValueError as e:
+            logger.error(f"❌ {e}")
+            return
+
     try:
         # create_graph() interne volá initialize_tools(). 
         # Ak inicializácia zlyhá (ValueError z config.py), zachytíme ju tu.
-        app = create_graph()
+        app = create_graph(checkpointer=checkpointer)
     except ValueError as e:
         # Zachytáva chyby konfigurácie (chýbajúce API kľúče)
         logger.error(f"\n❌ Chyba konfigurácie: {e}")
@@ -53,36 +82,70 @@ def run_agent(query: str):
         logger.error(f"❌ Neočakávaná chyba pri inicializácii agenta: {e}", exc_info=True)
         return
 
-    # 4. Spustenie agenta
+    # 4. Spustenie agenta (alebo obnova prerušeného behu z checkpointu)
     initial_state = {"user_query": query}
+    config = {"configurable": {"thread_id": run_id}} if checkpointing else None
+    if checkpointing:
+        snapshot = app.get_state(config)
+        if snapshot.next:
+            # None ako vstup = pokračovať od uložených uzlov (dopyty a výsledky vyhľadávania sa nevolajú znova)
+            initial_state = None
+            query = snapshot.values.get("user_query", query)
+            logger.info(f"♻️ Obnovujem beh '{run_id}' od uzla: {', '.join(snapshot.next)}")
+        elif snapshot.values:
+            logger.info(f"✅ Beh '{run_id}' je už dokončený.")
+            logger.info("\n================ FINÁLNY REPORT ================\n")
+            logger.info(snapshot.values.get("final_report", ""))
+            return
+        elif not _is_valid_query(query):
+            logger.error(f"❌ Beh '{run_id}' neexistuje. Zadajte prosím dopyt (min. 5 znakov).")
+            return
+        else:
+            logger.info(f"🧷 ID behu: {run_id} (pri zlyhaní ho zopakujte cez --run-id {run_id})")
+    logger.info(f"📝 Vaša požiadavka: '{query}'")
+
     final_state = None
+    streamed = False
     
     try:
-        # Iterujeme cez výstupy
-        for output in app.stream(initial_state):
-            for key, value in output.items():
-                if key != "__end__":
-                   final_state = value
+        # Časti reportu vypisujeme hneď, ako ich Report Generator vyprodukuje
+        for kind, value in stream_report(app, initial_state, config):
+            if kind == "token":
+                if not streamed:
+                    logger.info("\n================ FINÁLNY REPORT ================\n")
+                    streamed = True
+                on_token(value)
+            else:
+                final_state = value
         
-        logger.info("\n================ FINÁLNY REPORT ================\n")
         if final_state and "final_report" in final_state:
             report = final_state["final_report"]
-            # Vypíšeme finálny report (cez logger, ktorý má čistý console output)
-            logger.info(report)
+            if streamed:
+                # Na konzolu už report odišiel po častiach, do log súboru ho zapíšeme celý
+                if on_token is _print_token:
+                    _print_token("\n")
+                logger.info(report, extra={"file_only": True})
+            else:
+                logger.info("\n================ FINÁLNY REPORT ================\n")
+                logger.info(report)
             logger.info("\n✅ Úloha úspešne dokončená.")
         else:
             logger.warning("⚠️ Agent dokončil prácu, ale nevygeneroval finálny report.")
 
     except Exception as e:
         logger.error(f"\n❌ Nastala chyba počas behu agenta: {e}", exc_info=True)
+        if checkpointing:
+            logger.info(f"💡 Beh možno zopakovať od uzla, ktorý zlyhal: python src/main.py --run-id {run_id}")
 
 if __name__ == "__main__":
     # Predvolený testovací dopyt
     default_query = "Granty pre výskum etiky umelej inteligencie a jej dopadu na náboženské komunity v Európe."
 
-    # Umožníme zadať dopyt ako argument príkazového riadku
-    if len(sys.argv) > 1:
-        user_query = " ".join(sys.argv[1:])
-        run_agent(user_query)
-    else:
-        run_agent(default_query)
+    parser = argparse.ArgumentParser(description="Grant Finder agent pre humanitné vedy.")
+    parser.add_argument("query", nargs="*", help="Dopyt (predvolene testovací dopyt)")
+    parser.add_argument("--run-id", help="ID behu s checkpointmi; opakované spustenie pokračuje od uzla, ktorý zlyhal")
+    args = parser.parse_args()
+
+    # Pri obnove behu (--run-id bez dopytu) sa dopyt načíta z checkpointu
+    user_query = " ".join(args.query) or (None if args.run_id else default_query)
+    run_agent(user_query, run_id=args.run_id)
@@ -0,0 +1,268 @@
+# src/resilience.py
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from src.cache import CACHE_HIT_KEY
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Sieťové chyby bez HTTP kódu (openai, httpx, requests), ktoré má zmysel zopakovať
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectTimeout", "ReadTimeout", "Timeout"}
+_STATUS_IN_TEXT_RE = re.compile(r"\b([45]\d\d) (?:Client|Server) Error\b|\bstatus(?: code)?[ :=]+([45]\d\d)\b", re.IGNORECASE)
+
+class CircuitOpenError(Exception):
+    """Upstream je považovaný za nedostupný, volanie sa vôbec neodošle."""
+
+class UpstreamError(Exception):
+    """Chyba upstream služby, ktorú klient vrátil ako text namiesto výnimky (napr. Tavily)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    """Vráti HTTP kód z výnimky openai/httpx/requests, ak ho obsahuje."""
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+def is_retryable(exc: BaseException) -> bool:
+    """Prechodné chyby: 429, 5xx, timeouty a výpadky spojenia."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    code = status_code_of(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (ConnectionError, TimeoutError)) or type(exc).__name__ in RETRYABLE_ERROR_NAMES
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponenciálny backoff s "full jitter" (náhodne 0 až base * 2^attempt, max. max_delay)."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+class TokenBucket:
+    """Vlákno-bezpečný token bucket. Množstvo sa dopĺňa rýchlosťou `rate` za sekundu až po `capacity`.
+
+    `consume` môže ísť aj do mínusu (dodatočne zaúčtovaná spotreba, napr. skutočné tokeny LLM);
+    ďalšie `acquire` potom čaká, kým sa dlh nesplatí.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, amount: float) -> float:
+        """Pod zámkom: 0 a odčítanie, ak je dosť zásoby, inak čas do doplnenia."""
+        self._refill()
+        if self._level >= amount:
+            self._level -= amount
+            return 0.0
+        return (amount - self._level) / self.rate
+
+    def acquire(self, amount: float = 1.0, blocking: bool = True) -> bool:
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                wait = self._wait_time(amount)
+            if wait == 0.0:
+                return True
+            if not blocking:
+                return False
+            time.sleep(wait)
+
+    def consume(self, amount: float) -> None:
+        with self._lock:
+            self._refill()
+            self._level -= amount
+
+    def wait_until_available(self, blocking: bool = True) -> bool:
+        """Čaká, kým zásoba nie je záporná (bez odčítania)."""
+        return self.acquire(0.0, blocking)
+
+class CircuitBreaker:
+    """Po `failure_threshold` po sebe idúcich zlyhaniach prestane volať upstream na `reset_timeout` sekúnd.
+
+    Po uplynutí času prepustí jedno skúšobné volanie (half-open): úspech obvod zavrie, zlyhanie ho znova otvorí.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._probe_in_flight:
+                raise CircuitOpenError(f"{self.name} je dočasne nedostupný (circuit breaker otvorený, ešte {max(remaining, 0):.0f}s).")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"✅ {self.name} je opäť dostupný, circuit breaker zatvorený.")
+            self.failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self.failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"⛔ {self.name}: {self.failures} zlyhaní po sebe, circuit breaker otvorený na {self.reset_timeout:.0f}s.")
+                self._opened_at = time.monotonic()
+
+def call_with_retry(fn: Callable[[], Any], *, retries: int, base_delay: float, max_delay: float,
+                    breaker: Optional[CircuitBreaker] = None, name: str = "upstream") -> Any:
+    """Zavolá `fn` a pri prechodných chybách to zopakuje s backoffom (najviac `retries`-krát)."""
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_retryable(e):
+                # Chyba požiadavky (napr. 400) znamená, že upstream odpovedal, teda je dostupný
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            attempt += 1
+            logger.warning(f"🔁 {name}: prechodná chyba ({e}), pokus {attempt}/{retries} o {delay:.1f}s.")
+            time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+class ResilientSearchTool:
+    """Obal vyhľadávacieho nástroja: rate limit, opakovanie pri 429/5xx a circuit breaker.
+
+    Tavily pri chybe API nevyhodí výnimku, ale vráti jej textový popis; ten tu premeníme
+    na `UpstreamError`, aby sa dal zopakovať a nedostal sa do cache.
+    """
+
+    def __init__(self, tool: Any, limiter: TokenBucket, breaker: CircuitBreaker,
+                 retries: int, base_delay: float, max_delay: float):
+        self.tool = tool
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _call(self, tool_input: dict) -> Any:
+        self.limiter.acquire()
+        results = self.tool.invoke(tool_input)
+        if isinstance(results, str):
+            match = _STATUS_IN_TEXT_RE.search(results)
+            # Text bez HTTP kódu je najčastejšie výpadok spojenia, preto ho tiež skúsime znova
+            raise UpstreamError(results, int(match.group(1) or match.group(2)) if match else 503)
+        return results
+
+    def invoke(self, tool_input: dict) -> Any:
+        return call_with_retry(
+            lambda: self._call(tool_input), retries=self.retries, base_delay=self.base_delay,
+            max_delay=self.max_delay, breaker=self.breaker, name=f"Vyhľadávanie '{tool_input.get('query')}'"
+        )
+
+class LLMRateLimiter(BaseRateLimiter):
+    """Rate limiter pre ChatOpenAI: požiadavky za sekundu, tokeny za minútu a circuit breaker.
+
+    LangChain ho volá iba pri skutočnom volaní API (nie pri zásahu do cache). Skutočnú spotrebu
+    tokenov dodatočne zaúčtuje `LLMResilienceCallback`, ďalšie volanie potom počká na doplnenie.
+    """
+
+    def __init__(self, requests: TokenBucket, tokens: TokenBucket, breaker: CircuitBreaker):
+        self.requests = requests
+        self.tokens = tokens
+        self.breaker = breaker
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        self.breaker.before_call()
+        return self.tokens.wait_until_available(blocking) and self.requests.acquire(1, blocking)
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        self.breaker.before_call()
+        while not (self.tokens.wait_until_available(False) and self.requests.acquire(1, False)):
+            if not blocking:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+def _total_tokens(response: LLMResult, generations: list) -> int:
+    """Spotreba tokenov volania: `token_usage` z llm_output, pri streamovaní `usage_metadata` správ."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    total = usage.get("total_tokens") or (usage.get("prompt_tokens") or 0) + (usage.get("completion_tokens") or 0)
+    if total:
+        return total
+    # Streamované volanie (stream_usage=True) nemá llm_output, spotreba je v poslednej správe
+    return sum(
+        (getattr(getattr(generation, "message", None), "usage_metadata", None) or {}).get("total_tokens") or 0
+        for generation in generations
+    )
+
+class LLMResilienceCallback(BaseCallbackHandler):
+    """Zaúčtuje skutočne spotrebované tokeny a výsledky volaní pre circuit breaker."""
+
+    def __init__(self, limiter: LLMRateLimiter):
+        self.limiter = limiter
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        generations = [generation for batch in response.generations for generation in batch]
+        # Odpoveď z cache nečerpá limit a o dostupnosti API nič nehovorí
+        if generations and all((generation.generation_info or {}).get(CACHE_HIT_KEY) for generation in generations):
+            return
+        # Úspešné volanie API vždy zavrie obvod (aj skúšobné volanie v stave half-open bez údajov o spotrebe)
+        self.limiter.breaker.record_success()
+        total = _total_tokens(response, generations)
+        if total:
+            self.limiter.tokens.consume(total)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        # Sem sa dostanú až chyby po vyčerpaní opakovaní klienta openai (max_retries)
+        if isinstance(error, CircuitOpenError):
+            return
+        if is_retryable(error):
+            self.limiter.breaker.record_failure()
+        else:
+            # API odpovedalo (napr. 400), upstream je teda dostupný
+            self.limiter.breaker.record_success()
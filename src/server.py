@@ -0,0 +1,278 @@
+# src/server.py
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import AsyncIterator, Optional
+
+# Pridanie koreňového adresára do PYTHONPATH pre správne importy
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.agent.streaming import astream_report
+from src.config import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_QUEUE_SIZE
+from src.logger import setup_logger
+
+# Konfigurácia (setup_logger) prebehne v main(), aby import modulu nemal vedľajšie efekty
+logger = logging.getLogger("Server")
+
+MAX_BODY_BYTES = 64 * 1024
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class ServiceBusyError(Exception):
+    """Fronta požiadaviek je plná (backpressure)."""
+
+def normalize_query(query: str) -> str:
+    """Kľúč pre zlúčenie zhodných súbežných dopytov."""
+    return " ".join(query.lower().split())
+
+class GrantFinderService:
+    """Rezidentná služba nad jedným skompilovaným grafom.
+
+    Požiadavky idú cez ohraničenú frontu k pevnému počtu workerov. Zhodné dopyty,
+    ktoré sa práve spracúvajú, sa nespúšťajú znova: čakajú na výsledok prvého.
+    """
+
+    def __init__(self, app, workers: int = SERVICE_WORKERS, queue_size: int = SERVICE_QUEUE_SIZE):
+        self.app = app
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._inflight = {}
+        self._tasks = []
+        self.coalesced = 0
+        # Streamované behy nejdú cez frontu (klient číta priebežne), limituje ich rovnaký počet slotov
+        self._stream_slots = asyncio.Semaphore(max(1, workers))
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "inflight": len(self._inflight), "coalesced": self.coalesced}
+
+    async def submit(self, query: str) -> dict:
+        """Spracuje dopyt (alebo sa pripojí k už bežiacemu zhodnému dopytu) a vráti finálny stav."""
+        key = normalize_query(query)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            logger.info(f"🔗 Pripájam sa k bežiacemu dopytu: '{query}'")
+        else:
+            future = asyncio.get_running_loop().create_future()
+            try:
+                self._queue.put_nowait((query, future))
+            except asyncio.QueueFull:
+                raise ServiceBusyError("Služba je preťažená, skúste to prosím neskôr.")
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: zrušenie jedného klienta nesmie zrušiť výsledok pre ostatných
+        return await asyncio.shield(future)
+
+    def open_stream(self, query: str) -> AsyncIterator[tuple]:
+        """Spustí samostatný beh grafu, ktorý priebežne vracia časti reportu (bez zlučovania dopytov)."""
+        if self._stream_slots.locked():
+            raise ServiceBusyError("Služba je preťažená, skúste to prosím neskôr.")
+        return self._stream(query)
+
+    async def _stream(self, query: str) -> AsyncIterator[tuple]:
+        async with self._stream_slots:
+            async for kind, value in astream_report(self.app, {"user_query": query}):
+                yield kind, value
+
+    async def _worker(self) -> None:
+        while True:
+            query, future = await self._queue.get()
+            try:
+                state = await self.app.ainvoke({"user_query": query})
+                if not future.done():
+                    future.set_result(state)
+            except Exception as e:
+                logger.error(f"❌ Chyba počas behu agenta pre dopyt '{query}': {e}", exc_info=True)
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+class GrantFinderHTTPServer:
+    """Minimalistický HTTP/1.1 server nad asyncio (bez ďalších závislostí).
+
+    Endpointy: `GET /health`, `POST /search` s telom `{"query": "..."}` a `POST /search/stream`,
+    ktorý vracia NDJSON po častiach (chunked): `{"token": "..."}` a nakoniec `{"final_report": ...}`.
+    """
+
+    def __init__(self, service: GrantFinderService):
+        self.service = service
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str, port: int) -> int:
+        await self.service.start()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.service.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, payload = await self._dispatch(reader)
+        except Exception as e:
+            logger.error(f"❌ Neočakávaná chyba servera: {e}", exc_info=True)
+            status, payload = 500, {"error": "Interná chyba servera."}
+
+        if not isinstance(payload, dict):
+            await self._write_stream(writer, payload)
+            return
+
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 5")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, events: AsyncIterator[tuple]) -> None:
+        """Odošle udalosti streamu ako NDJSON riadky v chunked prenose (HTTP/1.1)."""
+        headers = [
+            "HTTP/1.1 200 OK",
+            "Content-Type: application/x-ndjson; charset=utf-8",
+            "Transfer-Encoding: chunked",
+            "Cache-Control: no-cache",
+            "Connection: close",
+        ]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+
+        async def send(event: dict) -> None:
+            line = (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            writer.write(f"{len(line):X}\r\n".encode("latin-1") + line + b"\r\n")
+            await writer.drain()
+
+        try:
+            try:
+                async for kind, value in events:
+                    if kind == "token":
+                        await send({"token": value})
+                    else:
+                        await send({
+                            "structured_grants": value.get("structured_grants", []),
+                            "final_report": value.get("final_report", ""),
+                        })
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                # Hlavička 200 už odišla, chybu preto posielame ako poslednú udalosť streamu
+                logger.error(f"❌ Chyba počas streamovaného behu agenta: {e}", exc_info=True)
+                await send({"error": f"Nastala chyba počas behu agenta: {e}"})
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except ConnectionError:
+            logger.info("🔌 Klient ukončil spojenie počas streamovania.")
+        finally:
+            await events.aclose()
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> tuple:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) < 2:
+            return 400, {"error": "Neplatná HTTP požiadavka."}
+        method, path = parts[0].upper(), parts[1].split("?", 1)[0]
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if path == "/health":
+            return 200, {"status": "ok", **self.service.stats()}
+        if path not in ("/search", "/search/stream"):
+            return 404, {"error": "Neznámy endpoint."}
+        if method != "POST":
+            return 405, {"error": "Použite POST."}
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            return 413, {"error": "Príliš veľká požiadavka."}
+        try:
+            request = json.loads((await reader.readexactly(length)).decode("utf-8") or "{}")
+            query = (request.get("query") or "").strip()
+        except (ValueError, AttributeError, asyncio.IncompleteReadError):
+            return 400, {"error": "Telo požiadavky musí byť JSON objekt s kľúčom 'query'."}
+        if len(query) < 5:
+            return 400, {"error": "Zadajte prosím konkrétnejší dopyt (min. 5 znakov)."}
+
+        if path == "/search/stream":
+            try:
+                return 200, self.service.open_stream(query)
+            except ServiceBusyError as e:
+                return 503, {"error": str(e)}
+
+        try:
+            state = await self.service.submit(query)
+        except ServiceBusyError as e:
+            return 503, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"Nastala chyba počas behu agenta: {e}"}
+        return 200, {
+            "query": query,
+            "structured_grants": state.get("structured_grants", []),
+            "final_report": state.get("final_report", ""),
+        }
+
+async def serve(host: str, port: int, workers: int, queue_size: int) -> None:
+    from src.agent.graph import create_graph
+
+    # Graf, nástroje a ich HTTP klienti sa vytvoria raz a zostávajú "teplé" pre všetky požiadavky
+    app = create_graph()
+    server = GrantFinderHTTPServer(GrantFinderService(app, workers, queue_size))
+    bound_port = await server.start(host, port)
+    logger.info(f"🚀 Grant Finder služba beží na http://{host}:{bound_port} (workerov: {workers}, fronta: {queue_size})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main():
+    # Force UTF-8 encoding for Windows
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    sys.stdout.reconfigure(encoding='utf-8')
+    setup_logger("Server")
+
+    parser = argparse.ArgumentParser(description="Grant Finder agent ako dlhobežiaca HTTP služba.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Počet súbežne bežiacich behov grafu")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE, help="Max. počet čakajúcich požiadaviek (potom 503)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue_size))
+    except ValueError as e:
+        logger.error(f"❌ Chyba konfigurácie: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        logger.info("👋 Služba ukončená.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# src/watch.py
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Pridanie koreňového adresára do PYTHONPATH pre správne importy
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.agent.deadlines import grant_deadline, parse_deadline
+from src.agent.dedup import find_grant, grant_identities
+from src.agent.report import render_delta_report
+from src.batch import load_queries
+from src.config import BATCH_WORKERS, REPORT_MODE, WATCH_INTERVAL_SECONDS, WATCH_STORE_PATH
+from src.logger import setup_logger
+
+# Konfigurácia (setup_logger) prebehne v main(), aby import modulu nemal vedľajšie efekty
+logger = logging.getLogger("Watch")
+
+# Polia, ktorých zmena sa hlási (vysvetlenie relevancie LLM formuluje zakaždým inak).
+# Názov je súčasťou identity grantu (grant_identities), premenovaná výzva je teda nová.
+WATCHED_FIELDS = ["deadline", "funding_body", "region"]
+
+def _index_grants(grants: List[Dict[str, Any]]) -> Dict[str, int]:
+    return {key: position for position, grant in enumerate(grants) for key in grant_identities(grant)}
+
+def _normalize_value(value: Any) -> str:
+    return " ".join(re.sub(r"[^\w]+", " ", str(value or "")).lower().split())
+
+def _same_value(field: str, old: Any, new: Any) -> bool:
+    if field == "deadline":
+        old_date, new_date = parse_deadline(old), parse_deadline(new)
+        if old_date and new_date:
+            return old_date == new_date
+    return _normalize_value(old) == _normalize_value(new)
+
+def diff_grants(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, list]:
+    """Porovná granty s predchádzajúcou kontrolou: nové výzvy a zmeny sledovaných polí."""
+    index = _index_grants(previous)
+    new, changed = [], []
+    for grant in current:
+        position = find_grant(index, grant)
+        if position is None:
+            new.append(grant)
+            continue
+        old = previous[position]
+        changes = {
+            field: [old.get(field), grant.get(field)]
+            for field in WATCHED_FIELDS
+            # Chýbajúca nová hodnota nie je zmena (LLM ju tentoraz len nenašiel)
+            if grant.get(field) and not _same_value(field, old.get(field), grant.get(field))
+        }
+        if changes:
+            changed.append({"grant": grant, "changes": changes})
+    return {"new": new, "changed": changed}
+
+def merge_snapshot(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Nový stav pre ďalšiu kontrolu: aktuálne granty prepíšu staré, neuvedené sa ponechajú, kým nevypršia.
+
+    Grant, ktorý vyhľadávanie dnes nevrátilo, tak zajtra nebude hlásený ako nový. Granty sa
+    párujú rovnako ako pri zlúčení dávok (grant_identities), viac výziev z jednej stránky ostane.
+    """
+    today = datetime.date.today()
+    merged = list(previous)
+    index = _index_grants(merged)
+    for grant in current:
+        position = find_grant(index, grant)
+        if position is None:
+            position = len(merged)
+            merged.append(grant)
+        else:
+            merged[position] = grant
+        index.update({key: position for key in grant_identities(grant)})
+    return [
+        grant for grant in merged
+        if (grant_deadline(grant) or datetime.date.max) >= today
+    ]
+
+def _query_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+class WatchStore:
+    """Posledný známy zoznam grantov pre každý sledovaný dopyt (SQLite)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS watches (
+                query_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                grants TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def load(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Vráti granty z poslednej kontroly alebo None, ak sa dopyt ešte nekontroloval."""
+        with self._lock:
+            row = self._conn.execute("SELECT grants FROM watches WHERE query_key = ?", (_query_key(query),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, query: str, grants: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watches (query_key, query, grants, checked_at) VALUES (?, ?, ?, ?)",
+                (_query_key(query), query, json.dumps(grants, ensure_ascii=False, default=str), time.time())
+            )
+            self._conn.commit()
+
+def build_delta_report(query: str, delta: Dict[str, list]) -> str:
+    """Report zo zmien. V režime "prose" ho napíše LLM, inak lokálna šablóna (bez LLM volania)."""
+    if REPORT_MODE == "prose":
+        from src.agent.nodes import node_report_generator
+
+        grants = delta["new"] + [item["grant"] for item in delta["changed"]]
+        return node_report_generator({"user_query": query, "structured_grants": grants})["final_report"]
+    return render_delta_report(query, delta["new"], delta["changed"])
+
+async def run_watch_cycle(app, store: WatchStore, queries: List[Dict[str, str]], workers: int = BATCH_WORKERS,
+                          report_fn: Callable[[str, Dict[str, list]], str] = build_delta_report) -> List[Dict[str, Any]]:
+    """Jedna kontrola všetkých sledovaných dopytov. Report sa tvorí iba pre dopyty so zmenami."""
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def check(item: Dict[str, str]) -> Dict[str, Any]:
+        record = {"id": item["id"], "query": item["query"], "checked_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        async with semaphore:
+            try:
+                final_state = await app.ainvoke({"user_query": item["query"]})
+            except Exception as e:
+                logger.error(f"❌ [{item['id']}] Chyba počas behu agenta: {e}", exc_info=True)
+                return {**record, "status": "error", "error": str(e)}
+
+        current = final_state.get("structured_grants", [])
+        previous = store.load(item["query"]) or []
+        delta = diff_grants(previous, current)
+        store.save(item["query"], merge_snapshot(previous, current))
+
+        if not delta["new"] and not delta["changed"]:
+            logger.info(f"✅ [{item['id']}] Bez zmien od poslednej kontroly.")
+            return {**record, "status": "unchanged", **delta}
+
+        logger.info(f"🔔 [{item['id']}] Nové výzvy: {len(delta['new'])}, zmenené: {len(delta['changed'])}")
+        report = await asyncio.to_thread(report_fn, item["query"], delta)
+        return {**record, "status": "changed", **delta, "report": report}
+
+    return await asyncio.gather(*(check(item) for item in queries))
+
+async def watch(app, store: WatchStore, input_path: str, interval: float, once: bool = False,
+                output_path: str = None, workers: int = BATCH_WORKERS) -> None:
+    """Opakovane kontroluje dopyty zo súboru (načítava ho pred každou kontrolou) v danom intervale."""
+    while True:
+        started = time.monotonic()
+        records = await run_watch_cycle(app, store, load_queries(input_path), workers)
+        for record in records:
+            if record.get("report"):
+                logger.info(f"\n================ ZMENY: {record['query']} ================\n")
+                logger.info(record["report"])
+        if output_path:
+            with open(output_path, "a", encoding="utf-8") as out:
+                for record in records:
+                    out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        if once:
+            return
+        delay = max(0.0, interval - (time.monotonic() - started))
+        logger.info(f"⏳ Ďalšia kontrola o {delay / 3600:.1f} h.")
+        await asyncio.sleep(delay)
+
+def main():
+    # Force UTF-8 encoding for Windows
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    sys.stdout.reconfigure(encoding='utf-8')
+    setup_logger("Watch")
+
+    parser = argparse.ArgumentParser(description="Pravidelná kontrola uložených dopytov, hlási iba nové a zmenené granty.")
+    parser.add_argument("input", help="JSONL súbor so sledovanými dopytmi (riadky {\"id\": ..., \"query\": ...})")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL_SECONDS, help="Interval medzi kontrolami v sekundách (predvolene 1 deň)")
+    parser.add_argument("--once", action="store_true", help="Vykonať jednu kontrolu a skončiť (napr. pre cron)")
+    parser.add_argument("--output", help="Dopĺňať výsledky kontrol (zmeny a reporty) do JSONL súboru")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    args = parser.parse_args()
+
+    from src.agent.graph import create_graph
+
+    # Graf bez Report Generatora: report sa tvorí iba zo zmien
+    try:
+        app = create_graph(with_report=False)
+    except ValueError as e:
+        logger.error(f"❌ Chyba konfigurácie: {e}")
+        sys.exit(1)
+
+    try:
+        asyncio.run(watch(app, WatchStore(WATCH_STORE_PATH), args.input, args.interval, args.once, args.output, args.workers))
+    except KeyboardInterrupt:
+        logger.info("👋 Sledovanie ukončené.")
+
+if __name__ == "__main__":
+    main()
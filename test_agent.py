@@ -1,7 +1,11 @@
 # test_agent.py
 import sys
 import os
+import asyncio
 import datetime
+import json
+import tempfile
+import time
 from dotenv import load_dotenv
 
 # Nastavenie cesty pre importy
@@ -16,6 +20,20 @@ try:
     from langchain_core.pydantic_v1 import ValidationError
     from src.agent.models import GrantInfo, GrantAnalysis
     from src.config import get_llm, get_search_tool
+    from src.agent import nodes
+    from src.agent.dedup import canonicalize_url, deduplicate_results, merge_grants
+    from src.agent.ranking import rank_results
+    from src.agent.report import render_report
+    from src.agent.grant_store import GrantStore
+    from src.agent.tracing import MetricsExporter, traced_node, record_search
+    from src.agent.streaming import stream_report
+    from src.agent.context_packer import get_token_counter, pack_results
+    from src.resilience import CircuitBreaker, CircuitOpenError, LLMRateLimiter, ResilientSearchTool, TokenBucket
+    from src.batch import run_batch
+    from src.watch import WatchStore, run_watch_cycle
+    from src.server import GrantFinderService, GrantFinderHTTPServer, ServiceBusyError
+    from src.cache import SQLiteTTLCache, CachedSearchTool, SQLiteLLMCache, normalize_query
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
 except ImportError as e:
     print(f"❌ Chyba pri importe modulov: {e}")
     print("Uistite sa, že ste nainštalovali závislosti z requirements.txt (pip install -r requirements.txt)")
@@ -81,6 +99,890 @@ def test_date():
     else:
         print(f"⚠️ Dátum je starý (Rok: {today.year}). Agent nemusí nájsť aktuálne granty.")
 
+class FakeSearchTool:
+    """Lokálna náhrada Tavily nástroja s umelým oneskorením (bez sieťových volaní)."""
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = []
+
+    def invoke(self, tool_input: dict) -> list:
+        query = tool_input["query"]
+        self.calls.append(query)
+        time.sleep(self.delay)
+        return [{"title": f"{query} #{i}", "url": f"https://example.com/{query}/{i}", "content": query} for i in range(2)]
+
+class FakeAnalystLLM:
+    """Lokálna náhrada LLM pre Grant Analyst: z každého výsledku v prompte vyrobí grant."""
+    def __init__(self, fail_on: str = None):
+        self.fail_on = fail_on
+        self.prompts = []
+
+    def with_structured_output(self, schema):
+        return self
+
+    def _analyze(self, messages):
+        human_prompt = messages[-1][1]
+        self.prompts.append(human_prompt)
+        if self.fail_on and self.fail_on in human_prompt:
+            raise RuntimeError("Simulovaná chyba LLM")
+        grants = []
+        for line in human_prompt.splitlines():
+            if line.startswith("URL: "):
+                url = line[len("URL: "):]
+                grants.append(GrantInfo(
+                    title=url.rstrip("/").rsplit("/", 1)[-1], url=url, relevance_explanation="Test",
+                    deadline="Neznámy", funding_body="Test", region="EU"
+                ))
+        return GrantAnalysis(grants=grants)
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        outputs = []
+        for messages in inputs:
+            try:
+                outputs.append(self._analyze(messages))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                outputs.append(e)
+        return outputs
+
+def test_search_executor_parallel():
+    """Dopyty bežia súbežne a výsledky sú zlúčené v poradí dopytov."""
+    original_tool = nodes.search_tool
+    nodes.search_tool = FakeSearchTool(delay=0.2)
+    try:
+        queries = ["q1", "q2", "q3", "q4"]
+        start = time.perf_counter()
+        output = nodes.node_search_executor({"optimized_queries": queries})
+        elapsed = time.perf_counter() - start
+    finally:
+        nodes.search_tool = original_tool
+
+    titles = [res["title"] for res in output["search_results"]]
+    assert titles == [f"{q} #{i}" for q in queries for i in range(2)]
+    # Sériovo by to trvalo 0.8s, paralelne približne ako najpomalší dopyt
+    assert elapsed < 0.6, f"Vyhľadávanie nebežalo paralelne ({elapsed:.2f}s)"
+    print(f"✅ Search Executor beží paralelne ({elapsed:.2f}s pre {len(queries)} dopyty).")
+
+def test_search_timeout():
+    """Dopyt pomalší ako timeout nezdrží uzol (uviaznuté vlákno sa nečaká)."""
+    import threading
+
+    class StalledSearchTool(FakeSearchTool):
+        def __init__(self):
+            super().__init__(delay=0.0)
+            self.release = threading.Event()
+
+        def invoke(self, tool_input):
+            if tool_input["query"] == "stalled":
+                # Simuluje HTTP spojenie bez timeoutu, ktoré sa "zasekne"
+                self.release.wait(5)
+            return super().invoke(tool_input)
+
+    original_tool, original_timeout = nodes.search_tool, nodes.SEARCH_TIMEOUT_SECONDS
+    nodes.search_tool, nodes.SEARCH_TIMEOUT_SECONDS = StalledSearchTool(), 0.3
+    try:
+        start = time.perf_counter()
+        output = nodes.node_search_executor({"optimized_queries": ["q1", "stalled"]})
+        elapsed = time.perf_counter() - start
+    finally:
+        nodes.search_tool.release.set()
+        nodes.search_tool, nodes.SEARCH_TIMEOUT_SECONDS = original_tool, original_timeout
+
+    assert [res["title"] for res in output["search_results"]] == ["q1 #0", "q1 #1"]
+    assert elapsed < 1.0, f"Uzol čakal na dopyt po timeoute ({elapsed:.2f}s)"
+
+    # Uviaznuté vlákno nesmie zdržať ani ukončenie procesu (main.py, batch.py po vypísaní reportu)
+    import subprocess
+    script = (
+        "import time\n"
+        "from src.agent import nodes\n"
+        "class StalledSearchTool:\n"
+        "    def invoke(self, tool_input):\n"
+        "        time.sleep(5)\n"
+        "        return []\n"
+        "nodes.search_tool, nodes.SEARCH_TIMEOUT_SECONDS = StalledSearchTool(), 0.3\n"
+        "nodes.node_search_executor({'optimized_queries': ['stalled']})\n"
+        "print('done', flush=True)\n"
+    )
+    process = subprocess.Popen([sys.executable, "-c", script], cwd=project_root, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    try:
+        assert process.stdout.readline().strip() == "done"
+        start = time.perf_counter()
+        process.wait(timeout=10)
+        exit_delay = time.perf_counter() - start
+    finally:
+        process.kill()
+        process.stdout.close()
+    assert exit_delay < 1.0, f"Proces čakal na dopyt po timeoute ({exit_delay:.2f}s)"
+    print(f"✅ Timeout vyhľadávania obmedzí trvanie uzla ({elapsed:.2f}s) aj ukončenie procesu ({exit_delay:.2f}s).")
+
+def test_search_cache():
+    """Cache normalizuje dopyty, počíta zásahy a vyraďuje najstaršie záznamy."""
+    assert normalize_query("  APVV Výzva 2025/2026 ") == normalize_query("apvv výzva 2026")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SQLiteTTLCache(os.path.join(tmp_dir, "cache.sqlite"), ttl_seconds=3600, max_entries=2)
+        fake_tool = FakeSearchTool(delay=0)
+        cached_tool = CachedSearchTool(fake_tool, cache)
+
+        first = cached_tool.invoke({"query": "Horizon Europe ethics 2025"})
+        second = cached_tool.invoke({"query": "horizon europe   ETHICS 2026"})
+        assert first == second
+        assert len(fake_tool.calls) == 1
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+        # LRU: po pridaní ďalších dvoch dopytov prvý vypadne
+        cached_tool.invoke({"query": "vega"})
+        cached_tool.invoke({"query": "kega"})
+        assert cache.stats()["size"] == 2
+        cached_tool.invoke({"query": "Horizon Europe ethics"})
+        assert len(fake_tool.calls) == 4
+
+        # TTL: expirované záznamy sa neberú do úvahy
+        cache.ttl_seconds = -1
+        assert cache.get(SQLiteTTLCache.make_key("search", normalize_query("kega"))) is None
+    print("✅ Cache vyhľadávania funguje (normalizácia, LRU, TTL).")
+
+def test_deduplication():
+    """Duplicitné URL a takmer zhodné snippety sa zlúčia do najlepšie hodnoteného výsledku."""
+    assert canonicalize_url("http://www.APVV.sk/vyzvy/?utm_source=x&id=5#top") == "https://apvv.sk/vyzvy?id=5"
+
+    snippet = (
+        "Agentúra na podporu výskumu a vývoja vyhlasuje všeobecnú výzvu VV 2025 na predkladanie žiadostí "
+        "o poskytnutie finančných prostriedkov na riešenie projektov výskumu a vývoja. Výzva je určená pre "
+        "všetky skupiny odborov vedy a techniky vrátane spoločenských a humanitných vied. Žiadosti je možné "
+        "predkladať elektronicky prostredníctvom informačného systému agentúry."
+    )
+    results = [
+        {"title": "APVV výzva", "url": "https://www.apvv.sk/vyzvy/", "content": snippet, "score": 0.5},
+        {"title": "Horizon Europe", "url": "https://ec.europa.eu/horizon", "content": "Cluster 2: Culture, creativity and inclusive society.", "score": 0.7},
+        {"title": "APVV výzva", "url": "http://apvv.sk/vyzvy?utm_campaign=mail", "content": snippet, "score": 0.9},
+        {"title": "APVV výzva", "url": "https://mirror.example.org/apvv", "content": snippet + " Zdroj: APVV.", "score": 0.1},
+    ]
+    deduplicated = deduplicate_results(results)
+    assert [res["title"] for res in deduplicated] == ["APVV výzva", "Horizon Europe"]
+    assert deduplicated[0]["score"] == 0.9
+    print("✅ Deduplikácia výsledkov funguje (kanonické URL, SimHash).")
+
+def test_merge_grants_listing_page():
+    """Rôzne výzvy z jednej stránky so zoznamom sa nezlúčia, rovnaká výzva z rôznych URL áno."""
+    listing = "https://www.apvv.sk/grantove-schemy/"
+    grants = [
+        {"title": "VV 2025", "url": listing, "deadline": "Neznámy", "relevance_explanation": "x"},
+        {"title": "Bilaterálna spolupráca SK-AT", "url": listing, "deadline": "Neznámy", "relevance_explanation": "x"},
+        {"title": "Podpora mladých výskumníkov", "url": listing, "deadline": "Neznámy", "relevance_explanation": "x"},
+        # Tá istá výzva z inej stránky (a s presnejším deadlinom) nahradí prvý záznam
+        {"title": "VV  2025", "url": "https://apvv.sk/vyzvy/vv-2025", "deadline": "do 15. marca 2030", "relevance_explanation": "x"},
+        # Rovnaká URL aj názov z inej dávky je duplicita
+        {"title": "Podpora mladých výskumníkov", "url": "http://apvv.sk/grantove-schemy?utm_source=x", "deadline": "Neznámy", "relevance_explanation": "x"},
+    ]
+    merged = merge_grants(grants)
+    assert [grant["title"] for grant in merged] == ["VV  2025", "Bilaterálna spolupráca SK-AT", "Podpora mladých výskumníkov"]
+    assert merged[0]["deadline"] == "do 15. marca 2030"
+    print("✅ Zlúčenie grantov zachová rôzne výzvy z jednej stránky so zoznamom.")
+
+def test_merge_grants_generic_title():
+    """Všeobecný názov od rôznych poskytovateľov nie je duplicita (zlúčenie aj offline index)."""
+    grants = [
+        {"title": "Research Fellowship", "url": "https://www.templeton.org/grants/fellowship", "funding_body": "Templeton",
+         "deadline": "Neznámy", "relevance_explanation": "x", "region": "Global"},
+        {"title": "Research Fellowship", "url": "https://mellon.org/grants/research-fellowship", "funding_body": "Mellon",
+         "deadline": "do 1. mája 2030", "relevance_explanation": "x", "region": "Global"},
+        # Rovnaký poskytovateľ na inej stránke je tá istá výzva
+        {"title": "Research  Fellowship", "url": "https://templeton.org/news/fellowship", "funding_body": "Templeton",
+         "deadline": "do 1. júna 2030", "relevance_explanation": "x", "region": "Global"},
+    ]
+    merged = merge_grants(grants)
+    assert sorted(grant["funding_body"] for grant in merged) == ["Mellon", "Templeton"]
+    assert next(grant for grant in merged if grant["funding_body"] == "Templeton")["deadline"] == "do 1. júna 2030"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GrantStore(os.path.join(tmp_dir, "grants.sqlite"), ttl_seconds=3600)
+        for grant in grants[:2]:
+            store.record_page({"url": grant["url"], "content": "Fellowship"}, "fellowship", [grant])
+        found = store.search(keyword="fellowship", include_expired=True)
+        assert sorted(grant["funding_body"] for grant in found) == ["Mellon", "Templeton"]
+    print("✅ Granty s rovnakým všeobecným názvom od rôznych poskytovateľov ostanú samostatné.")
+
+def test_grant_analyst_map_reduce():
+    """Map-reduce analýza spracuje všetky výsledky v dávkach a zlúči duplicitné granty."""
+    results = [{"title": f"R{i}", "url": f"https://example.com/grant-{i % 10}", "content": "výzva"} for i in range(20)]
+    results.append({"title": "Broken", "url": "https://example.com/fail", "content": "výzva"})
+
+    original_llm = nodes.llm
+    nodes.llm = FakeAnalystLLM(fail_on="https://example.com/fail")
+    try:
+        output = nodes.node_grant_analyst({"ranked_results": results, "user_query": "test"})
+        prompts = nodes.llm.prompts
+    finally:
+        nodes.llm = original_llm
+
+    if nodes.ANALYST_MODE == "map_reduce":
+        assert len(prompts) == -(-len(results) // nodes.ANALYST_BATCH_SIZE)
+    urls = sorted(grant["url"] for grant in output["structured_grants"])
+    # Dávka s chybou sa preskočí, duplicitné URL z rôznych dávok sa zlúčia
+    assert len(urls) == len(set(urls))
+    print(f"✅ Grant Analyst (map-reduce) zlúčil {len(urls)} unikátnych grantov z {len(prompts)} dávok.")
+
+def test_result_ranker():
+    """BM25 zoradí relevantné grantové výzvy pred irelevantné výsledky."""
+    results = [
+        {"title": "Správy zo sveta", "url": "https://news.example.com", "content": "Počasie a šport na víkend."},
+        {"title": "University homepage", "url": "https://uni.example.com", "content": "Welcome to our faculty of arts."},
+        {"title": "ERC Advanced Grant", "url": "https://erc.europa.eu", "content": "Call for proposals in philosophy and ethics, deadline 2026."},
+        {"title": "Výzva APVV", "url": "https://apvv.sk", "content": "Výzva na podávanie žiadostí v oblasti etiky, uzávierka v marci."},
+    ]
+    ranked = rank_results(results, "Granty pre etiku a filozofiu", top_k=3)
+    assert len(ranked) == 3
+    assert {res["title"] for res in ranked[:2]} == {"ERC Advanced Grant", "Výzva APVV"}
+    assert ranked[0]["relevance"] >= ranked[1]["relevance"] >= ranked[2]["relevance"]
+    print("✅ Result Ranker (BM25) zoradil výsledky podľa relevancie.")
+
+def test_template_report():
+    """Šablónový report je deterministický, zoskupený podľa regiónu a zoradený podľa deadlinu."""
+    grants = [
+        {"title": "ERC Consolidator", "url": "https://erc.europa.eu", "relevance_explanation": "Filozofia.",
+         "deadline": "Neznámy", "funding_body": "ERC", "region": "EU"},
+        {"title": "APVV VV 2025", "url": "https://apvv.sk", "relevance_explanation": "Etika.",
+         "deadline": "30.11.2025", "funding_body": "APVV", "region": "Slovakia"},
+        {"title": "Horizon Cluster 2", "url": "https://ec.europa.eu", "relevance_explanation": "Etika AI.",
+         "deadline": "2025-03-15", "funding_body": "Horizon Europe", "region": "EU"},
+    ]
+    report = render_report("etika AI", grants)
+    assert report == render_report("etika AI", list(reversed(grants)))
+    assert "Našiel som 3 relevantné otvorené výzvy" in report
+    positions = [report.index(title) for title in ("APVV VV 2025", "Horizon Cluster 2", "ERC Consolidator")]
+    assert positions == sorted(positions)
+    print("✅ Šablónový report je deterministický a správne zoradený.")
+
+class FakeGraphApp:
+    """Lokálna náhrada skompilovaného grafu pre dávkový režim."""
+    def __init__(self, fail_on: str = None, delay: float = 0.05):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.queries = []
+
+    async def ainvoke(self, state: dict) -> dict:
+        self.queries.append(state["user_query"])
+        await asyncio.sleep(self.delay)
+        if self.fail_on and self.fail_on in state["user_query"]:
+            raise RuntimeError("Simulovaná chyba")
+        return {"structured_grants": [], "final_report": f"Report: {state['user_query']}"}
+
+def test_batch_mode_resume():
+    """Dávkový režim zapíše výsledok pre každý dopyt a po opätovnom spustení preskočí hotové ID."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "queries.jsonl")
+        output_path = os.path.join(tmp_dir, "results.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for i in range(5):
+                f.write(json.dumps({"id": f"p{i}", "query": f"Granty pre profil {i}"}) + "\n")
+
+        first_app = FakeGraphApp(fail_on="profil 3")
+        stats = asyncio.run(run_batch(first_app, input_path, output_path, workers=3))
+        assert stats == {"ok": 4, "error": 1, "skipped": 0}
+
+        # Obnovenie: spracuje sa iba dopyt, ktorý predtým zlyhal
+        second_app = FakeGraphApp()
+        stats = asyncio.run(run_batch(second_app, input_path, output_path, workers=3))
+        assert second_app.queries == ["Granty pre profil 3"]
+        assert stats == {"ok": 1, "error": 0, "skipped": 4}
+
+        with open(output_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert sorted(r["id"] for r in records if r["status"] == "ok") == [f"p{i}" for i in range(5)]
+    print("✅ Dávkový režim zapisuje výsledky priebežne a obnoví sa po chybe.")
+
+def test_llm_cache():
+    """Opakovaný prompt sa obslúži z perzistentnej cache, uzol v bypass zozname ju obíde."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SQLiteLLMCache(SQLiteTTLCache(os.path.join(tmp_dir, "llm.sqlite"), ttl_seconds=3600, max_entries=10))
+        fake_llm = FakeListChatModel(responses=["prvá odpoveď", "druhá odpoveď"], cache=cache)
+
+        assert fake_llm.invoke("Rovnaký prompt").content == "prvá odpoveď"
+        assert fake_llm.invoke("Rovnaký prompt").content == "prvá odpoveď"
+        assert cache.cache_stats()["hits"] == 1
+
+        original_llm, original_bypass = nodes.llm, set(nodes.LLM_CACHE_BYPASS_NODES)
+        nodes.llm = fake_llm
+        nodes.LLM_CACHE_BYPASS_NODES.add("report_generator")
+        try:
+            assert nodes._llm_for("report_generator").invoke("Rovnaký prompt").content == "druhá odpoveď"
+            assert nodes._llm_for("grant_analyst") is fake_llm
+        finally:
+            nodes.llm = original_llm
+            nodes.LLM_CACHE_BYPASS_NODES.clear()
+            nodes.LLM_CACHE_BYPASS_NODES.update(original_bypass)
+    print("✅ LLM cache funguje (zásah pri opakovanom prompte, bypass pre vybrané uzly).")
+
+def test_grant_store_incremental():
+    """Nezmenené stránky sa druhýkrát neanalyzujú a index je prehľadávateľný offline."""
+    results = [{"title": f"Výzva {i}", "url": f"https://example.com/etika-{i}", "content": "Grant pre etiku"} for i in range(3)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        original_llm, original_store = nodes.llm, nodes.grant_store
+        nodes.grant_store = GrantStore(os.path.join(tmp_dir, "grants.sqlite"), ttl_seconds=3600)
+        try:
+            nodes.llm = FakeAnalystLLM()
+            first = nodes.node_grant_analyst({"ranked_results": results, "user_query": "etika"})
+            assert nodes.llm.prompts
+
+            nodes.llm = FakeAnalystLLM()
+            second = nodes.node_grant_analyst({"ranked_results": results, "user_query": "etika"})
+            assert nodes.llm.prompts == []
+            assert second["structured_grants"] == first["structured_grants"]
+
+            # Zmenený snippet sa analyzuje znova
+            changed = results[:2] + [{**results[2], "content": "Nový termín výzvy"}]
+            nodes.llm = FakeAnalystLLM()
+            nodes.node_grant_analyst({"ranked_results": changed, "user_query": "etika"})
+            assert len(nodes.llm.prompts) == 1 and "Nový termín výzvy" in nodes.llm.prompts[0]
+
+            found = nodes.grant_store.search(keyword="etik", region="eu")
+            assert sorted(grant["url"] for grant in found) == sorted(res["url"] for res in results)
+        finally:
+            nodes.llm, nodes.grant_store = original_llm, original_store
+    print("✅ Index grantov preskočí už analyzované stránky a podporuje offline vyhľadávanie.")
+
+def test_grant_store_query_scoped():
+    """Analýza stránky uložená pre jeden dopyt sa nepoužije pre iný dopyt (relevancia závisí od dopytu)."""
+    class QueryAwareLLM(FakeAnalystLLM):
+        def _analyze(self, messages):
+            analysis = super()._analyze(messages)
+            # Stránka je relevantná iba pre dopyt o teológii
+            if "teológia" not in messages[-1][1]:
+                analysis.grants = []
+            return analysis
+
+    results = [{"title": "Templeton fellowship", "url": "https://example.com/fellowship", "content": "Theology fellowship"}]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        original_llm, original_store = nodes.llm, nodes.grant_store
+        nodes.grant_store = GrantStore(os.path.join(tmp_dir, "grants.sqlite"), ttl_seconds=3600)
+        try:
+            nodes.llm = QueryAwareLLM()
+            first = nodes.node_grant_analyst({"ranked_results": results, "user_query": "etika AI"})
+            assert first["structured_grants"] == [] and len(nodes.llm.prompts) == 1
+
+            # Iný dopyt: prázdny výsledok z prvého dopytu sa nepoužije, stránka sa analyzuje znova
+            nodes.llm = QueryAwareLLM()
+            second = nodes.node_grant_analyst({"ranked_results": results, "user_query": "teológia fellowship"})
+            assert len(nodes.llm.prompts) == 1
+            assert [grant["url"] for grant in second["structured_grants"]] == ["https://example.com/fellowship"]
+
+            # Rovnaké dopyty (aj s inou veľkosťou písmen a medzerami) už LLM nevolajú
+            for query, expected in (("Etika  AI", []), ("teológia fellowship", second["structured_grants"])):
+                nodes.llm = QueryAwareLLM()
+                again = nodes.node_grant_analyst({"ranked_results": results, "user_query": query})
+                assert nodes.llm.prompts == [] and again["structured_grants"] == expected
+        finally:
+            nodes.llm, nodes.grant_store = original_llm, original_store
+    print("✅ Index grantov oddeľuje výsledky analýzy podľa dopytu.")
+
+def test_benchmark_smoke():
+    """Offline benchmark prejde celým grafom s lokálnymi náhradami a vráti metriky pre každý uzol."""
+    from benchmarks.run_benchmarks import run_scenario
+    from src.config import METRICS_JSONL_PATH, METRICS_PROM_PATH
+
+    def metrics_files():
+        return [os.path.getmtime(path) if os.path.exists(path) else None for path in (METRICS_JSONL_PATH, METRICS_PROM_PATH)]
+
+    before = metrics_files()
+    scenario = {"name": "smoke", "num_queries": 3, "results_per_query": 5, "content_size": 300,
+                "search_latency": 0.0, "llm_latency": 0.0, "concurrency": 2}
+    original = (nodes.llm, nodes.search_tool, nodes.grant_store)
+    try:
+        result = run_scenario(scenario, runs=1)
+    finally:
+        nodes.llm, nodes.search_tool, nodes.grant_store = original
+
+    for node_name in ("query_optimizer", "search_executor", "grant_analyst", "report_generator", "__total__"):
+        assert node_name in result["latency_seconds"]
+    assert result["prompt_chars"]["grant_analyst"]["calls"] >= 1
+    assert result["peak_memory_bytes"] > 0
+    # Benchmark nezapisuje do produkčných metrík v logs/
+    assert metrics_files() == before
+    print("✅ Offline benchmark beží bez sieťových volaní.")
+
+def test_node_tracing():
+    """Obalený uzol zaznamená čas, LLM volania, vyhľadávania a počty výsledkov (JSONL + Prometheus)."""
+    fake_llm = FakeListChatModel(responses=["odpoveď"])
+
+    def node(state):
+        fake_llm.invoke("Prompt s dĺžkou 25 znakov")
+        record_search(0.5)
+        return {"search_results": [1, 2, 3]}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exporter = MetricsExporter(os.path.join(tmp_dir, "metrics.jsonl"), os.path.join(tmp_dir, "metrics.prom"))
+        traced = traced_node("search_executor", node, exporter)
+        assert traced({}, {"configurable": {"thread_id": "run-1"}}) == {"search_results": [1, 2, 3]}
+
+        with open(exporter.jsonl_path, encoding="utf-8") as f:
+            record = json.loads(f.readline())
+        with open(exporter.prom_path, encoding="utf-8") as f:
+            prom = f.read()
+
+    assert record["node"] == "search_executor" and record["thread_id"] == "run-1"
+    assert record["llm_calls"] == 1 and record["prompt_chars"] == 25
+    assert record["search_calls"] == 1 and record["result_counts"] == {"search_results": 3}
+    assert 'grant_finder_search_calls_total{node="search_executor"} 1' in prom
+    assert prom.rstrip().endswith("# EOF")
+    print("✅ Metriky uzlov sa zapisujú do JSONL aj Prometheus textfile.")
+
+def test_service_coalescing_and_backpressure():
+    """Služba zlúči zhodné súbežné dopyty do jedného behu grafu a pri plnej fronte odmietne ďalšie."""
+    async def scenario():
+        app = FakeGraphApp(delay=0.2)
+        server = GrantFinderHTTPServer(GrantFinderService(app, workers=1, queue_size=1))
+        port = await server.start("127.0.0.1", 0)
+        try:
+            service = server.service
+            same = [asyncio.create_task(service.submit(q)) for q in ("Etika AI granty", "etika ai  GRANTY", "Etika AI granty")]
+            await asyncio.sleep(0.05)
+            # Worker spracúva prvý dopyt, druhý čaká vo fronte, tretí už neprejde (backpressure)
+            queued = asyncio.create_task(service.submit("Granty pre teológiu"))
+            await asyncio.sleep(0)
+            try:
+                await service.submit("Granty pre religionistiku")
+                raise AssertionError("Očakávaná chyba ServiceBusyError")
+            except ServiceBusyError:
+                pass
+            results = await asyncio.gather(*same, queued)
+            assert app.queries == ["Etika AI granty", "Granty pre teológiu"]
+            assert results[0] is results[1] is results[2]
+            assert service.coalesced == 2
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"query": "Granty pre filozofiu"}).encode("utf-8")
+            writer.write(b"POST /search HTTP/1.1\r\nContent-Type: application/json\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            await writer.drain()
+            response = (await reader.read()).decode("utf-8")
+            writer.close()
+            assert response.startswith("HTTP/1.1 200")
+            assert json.loads(response.split("\r\n\r\n", 1)[1])["final_report"] == "Report: Granty pre filozofiu"
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
+    print("✅ Služba zlučuje zhodné dopyty a uplatňuje backpressure.")
+
+def test_report_streaming():
+    """Report Generator posiela časti reportu priebežne a ich spojenie je zhodné s finálnym reportom."""
+    from langgraph.graph import StateGraph, END
+    from src.agent.models import GrantFinderState
+
+    grants = [{"title": "Grant pre etiku AI", "url": "https://example.com/etika", "relevance_explanation": "Etika AI",
+               "deadline": "2030-01-31", "funding_body": "APVV", "region": "Slovakia"}]
+    original_llm, original_mode = nodes.llm, nodes.REPORT_MODE
+    nodes.llm = FakeListChatModel(responses=["## Nájdené granty\nGrant pre etiku AI (APVV)"])
+    nodes.REPORT_MODE = "prose"
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exporter = MetricsExporter(os.path.join(tmp_dir, "metrics.jsonl"), os.path.join(tmp_dir, "metrics.prom"))
+            workflow = StateGraph(GrantFinderState)
+            workflow.add_node("report_generator", traced_node("report_generator", nodes.node_report_generator, exporter))
+            workflow.set_entry_point("report_generator")
+            workflow.add_edge("report_generator", END)
+            app = workflow.compile()
+
+            events = list(stream_report(app, {"user_query": "etika AI", "structured_grants": grants}))
+    finally:
+        nodes.llm, nodes.REPORT_MODE = original_llm, original_mode
+
+    tokens = [value for kind, value in events if kind == "token"]
+    assert len(tokens) > 1
+    assert events[-1][0] == "state"
+    assert "".join(tokens) == events[-1][1]["final_report"] == "## Nájdené granty\nGrant pre etiku AI (APVV)"
+    print("✅ Report sa streamuje po častiach.")
+
+def test_context_packing():
+    """Rozpočet tokenov sa delí podľa relevancie a pri orezaní ostávajú vety s termínom a podmienkami."""
+    filler = "Projekt sa venuje širokému spektru tém z oblasti humanitných vied a filozofie. " * 20
+    results = [
+        {"title": "Výzva A", "url": "https://example.com/a", "relevance": 3.0,
+         "content": filler + "Uzávierka výzvy je 31. 3. 2030. " + filler},
+        {"title": "Výzva B", "url": "https://example.com/b", "relevance": 1.0,
+         "content": filler + "Oprávnení žiadatelia sú univerzity. " + filler},
+        {"title": "Výzva C", "url": "https://example.com/c", "relevance": 0.1, "content": filler},
+    ]
+    count_tokens = get_token_counter("gpt-4o")
+
+    packed = pack_results(results, token_budget=400, model="gpt-4o", min_tokens_per_result=40)
+    by_url = {res["url"]: res for res in packed}
+    used = sum(count_tokens(res["llm_content"]) + count_tokens(f"{res['title']}\n{res['url']}") for res in packed)
+    assert used <= 400
+    assert "Uzávierka výzvy je 31. 3. 2030." in by_url["https://example.com/a"]["llm_content"]
+    assert "Oprávnení žiadatelia sú univerzity." in by_url["https://example.com/b"]["llm_content"]
+    assert count_tokens(by_url["https://example.com/a"]["llm_content"]) > count_tokens(by_url["https://example.com/b"]["llm_content"])
+    # Pôvodný obsah ostáva kvôli hashu v indexe grantov
+    assert by_url["https://example.com/a"]["content"] == results[0]["content"]
+
+    # Malý rozpočet: najmenej relevantný výsledok vypadne, poradie ostatných sa zachová
+    small = pack_results(results, token_budget=120, model="gpt-4o", min_tokens_per_result=40)
+    assert [res["url"] for res in small] == ["https://example.com/a", "https://example.com/b"]
+    print("✅ Snippety sa balia do rozpočtu tokenov podľa relevancie.")
+
+def test_checkpoint_resume():
+    """Beh, ktorý zlyhal v Report Generatori, pokračuje z checkpointu bez nového vyhľadávania."""
+    import sqlite3
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    from benchmarks.fakes import FakeChatModel, FakeSearchTool
+    from src.agent.graph import create_graph
+
+    class FlakyReportLLM(FakeChatModel):
+        failures = 1
+
+        def invoke(self, input, config=None, **kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("Upstream nedostupný")
+            return super().invoke(input, config, **kwargs)
+
+    fake_llm = FlakyReportLLM(num_queries=2, report_size=200)
+    fake_search = FakeSearchTool(results_per_query=3, content_size=200)
+    original = (nodes.llm, nodes.search_tool, nodes.grant_store, nodes.REPORT_MODE)
+    nodes.llm, nodes.search_tool, nodes.grant_store = fake_llm, fake_search, None
+    nodes.REPORT_MODE = "prose"
+    try:
+        app = create_graph(checkpointer=SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False)), exporter=None)
+        config = {"configurable": {"thread_id": "run-1"}}
+        try:
+            app.invoke({"user_query": "Granty pre etiku AI"}, config)
+            raise AssertionError("Očakávaná chyba ConnectionError")
+        except ConnectionError:
+            pass
+        snapshot = app.get_state(config)
+        assert snapshot.next == ("report_generator",)
+        assert snapshot.values["optimized_queries"] and snapshot.values["search_results"]
+        search_calls = fake_search.calls
+        llm_calls = {kind: len(sizes) for kind, sizes in fake_llm.prompt_chars.items()}
+
+        final_state = app.invoke(None, config)
+    finally:
+        nodes.llm, nodes.search_tool, nodes.grant_store, nodes.REPORT_MODE = original
+
+    assert final_state["final_report"]
+    assert not app.get_state(config).next
+    # Optimizer, vyhľadávanie ani analýza sa pri obnove nespúšťajú znova
+    assert fake_search.calls == search_calls
+    assert len(fake_llm.prompt_chars["query_optimizer"]) == llm_calls["query_optimizer"]
+    assert len(fake_llm.prompt_chars["grant_analyst"]) == llm_calls["grant_analyst"]
+    print("✅ Neúspešný beh pokračuje z checkpointu od uzla, ktorý zlyhal.")
+
+def test_resilience():
+    """Rate limit, opakovanie pri 429/5xx a circuit breaker pre vyhľadávanie a LLM."""
+    class FlakyTool:
+        def __init__(self, responses):
+            self.responses = list(responses)
+            self.calls = 0
+
+        def invoke(self, tool_input):
+            self.calls += 1
+            return self.responses.pop(0) if self.responses else self.fallback
+
+    # Tavily vracia chyby ako text: 429 sa zopakuje, výsledok sa nestratí
+    flaky = FlakyTool(["HTTPError('429 Client Error: Too Many Requests')", "HTTPError('502 Server Error: Bad Gateway')",
+                       [{"title": "Výzva", "url": "https://example.com"}]])
+    tool = ResilientSearchTool(flaky, TokenBucket(1000, 10), CircuitBreaker("Tavily", 5, 30), retries=3, base_delay=0.01, max_delay=0.02)
+    assert tool.invoke({"query": "etika"}) == [{"title": "Výzva", "url": "https://example.com"}]
+    assert flaky.calls == 3
+
+    # Trvalý výpadok: po 2 zlyhaniach sa obvod otvorí a ďalšie volania zlyhajú okamžite
+    down = FlakyTool([])
+    down.fallback = "HTTPError('503 Server Error: Service Unavailable')"
+    breaker = CircuitBreaker("Tavily", failure_threshold=2, reset_timeout=30)
+    tool = ResilientSearchTool(down, TokenBucket(1000, 10), breaker, retries=5, base_delay=0.01, max_delay=0.02)
+    for _ in range(2):
+        try:
+            tool.invoke({"query": "etika"})
+            raise AssertionError("Očakávaná chyba CircuitOpenError")
+        except CircuitOpenError:
+            pass
+    assert down.calls == 2 and breaker.state == "open"
+
+    # Token bucket: 5 požiadaviek pri 50 req/s a kapacite 1 trvá aspoň ~80 ms
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 0.07
+
+    # LLM: skutočná spotreba tokenov nad kapacitu pribrzdí ďalšie volanie, kým sa dlh nesplatí
+    limiter = LLMRateLimiter(TokenBucket(1000, 10), TokenBucket(rate=1000, capacity=100), CircuitBreaker("OpenAI", 5, 30))
+    limiter.tokens.consume(150)
+    assert not limiter.acquire(blocking=False)
+    start = time.perf_counter()
+    assert limiter.acquire()
+    assert time.perf_counter() - start >= 0.03
+    print("✅ Rate limiter, backoff a circuit breaker fungujú.")
+
+def test_llm_breaker_probe():
+    """Úspešné skúšobné volanie bez údajov o spotrebe zavrie obvod; odpoveď z cache sa nepočíta."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, LLMResult
+    from src.resilience import LLMResilienceCallback
+
+    def reopen(breaker):
+        breaker.record_failure()
+        assert breaker.state == "open"
+        time.sleep(0.06)
+        assert breaker.state == "half_open"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        breaker = CircuitBreaker("OpenAI", failure_threshold=1, reset_timeout=0.05)
+        limiter = LLMRateLimiter(TokenBucket(1000, 10), TokenBucket(rate=1, capacity=1000), breaker)
+        cache = SQLiteLLMCache(SQLiteTTLCache(os.path.join(tmp_dir, "llm.sqlite"), ttl_seconds=3600, max_entries=100))
+        # FakeListChatModel (ako streamovaný report) nevracia llm_output s token_usage
+        model = FakeListChatModel(responses=["odpoveď"] * 5, cache=cache, rate_limiter=limiter,
+                                  callbacks=[LLMResilienceCallback(limiter)])
+
+        reopen(breaker)
+        model.invoke("prvý prompt")
+        assert breaker.state == "closed"
+        assert limiter.acquire(blocking=False)
+
+        # Zásah do cache nie je volanie API: obvod ostáva half-open, ďalšie skutočné volanie ho zavrie
+        reopen(breaker)
+        model.invoke("prvý prompt")
+        assert breaker.state == "half_open"
+        model.invoke("druhý prompt")
+        assert breaker.state == "closed"
+
+    # Streamované volanie (stream_usage=True) zaúčtuje spotrebu z usage_metadata správy
+    limiter = LLMRateLimiter(TokenBucket(1000, 10), TokenBucket(rate=1, capacity=1000), CircuitBreaker("OpenAI", 5, 30))
+    message = AIMessage(content="report", usage_metadata={"input_tokens": 600, "output_tokens": 200, "total_tokens": 800})
+    LLMResilienceCallback(limiter).on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+    assert limiter.tokens._level <= 201
+    print("✅ Circuit breaker sa po úspešnom skúšobnom volaní zavrie, streamované tokeny sa zaúčtujú.")
+
+def test_watch_mode_delta():
+    """Watch režim hlási iba nové a zmenené granty a bez zmien negeneruje report."""
+    grant = {"title": "Grant pre etiku AI", "url": "https://example.com/etika?utm_source=x", "relevance_explanation": "Etika",
+             "deadline": "31. 3. 2030", "funding_body": "APVV", "region": "Slovakia"}
+
+    class WatchApp:
+        def __init__(self):
+            self.grants = []
+
+        async def ainvoke(self, state):
+            return {"structured_grants": [dict(g) for g in self.grants]}
+
+    reports = []
+    def report_fn(query, delta):
+        reports.append(delta)
+        return "report"
+
+    app = WatchApp()
+    queries = [{"id": "etika", "query": "Granty pre etiku AI"}]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = WatchStore(os.path.join(tmp_dir, "watch.sqlite"))
+
+        app.grants = [grant]
+        first = asyncio.run(run_watch_cycle(app, store, queries, report_fn=report_fn))[0]
+        assert first["status"] == "changed" and len(first["new"]) == 1
+
+        # Rovnaký grant (iná formulácia vysvetlenia, URL bez sledovacích parametrov, iný formát dátumu)
+        app.grants = [{**grant, "url": "https://example.com/etika", "relevance_explanation": "Iné", "deadline": "2030-03-31"}]
+        second = asyncio.run(run_watch_cycle(app, store, queries, report_fn=report_fn))[0]
+        assert second["status"] == "unchanged" and "report" not in second
+
+        new_grant = {**grant, "title": "Nová výzva", "url": "https://example.com/nova"}
+        app.grants = [{**grant, "deadline": "30. 4. 2030"}, new_grant]
+        third = asyncio.run(run_watch_cycle(app, store, queries, report_fn=report_fn))[0]
+        assert third["status"] == "changed" and third["report"] == "report"
+        assert [g["title"] for g in third["new"]] == ["Nová výzva"]
+        assert third["changed"][0]["changes"] == {"deadline": ["2030-03-31", "30. 4. 2030"]}
+
+        # Grant, ktorý dnes nevyšiel vo výsledkoch, sa zajtra nehlási ako nový
+        app.grants = [new_grant]
+        asyncio.run(run_watch_cycle(app, store, queries, report_fn=report_fn))
+        app.grants = [{**grant, "deadline": "30. 4. 2030"}, new_grant]
+        fifth = asyncio.run(run_watch_cycle(app, store, queries, report_fn=report_fn))[0]
+        assert fifth["status"] == "unchanged"
+
+        # Dve výzvy z jednej stránky so zoznamom: snapshot zachová obe, ďalšia kontrola je bez zmien
+        listing = "https://www.apvv.sk/grantove-schemy/"
+        apvv_queries = [{"id": "apvv", "query": "Výzvy APVV"}]
+        app.grants = [{**grant, "title": "VV 2025", "url": listing, "deadline": "31. 3. 2030"},
+                      {**grant, "title": "Bilaterálna spolupráca SK-AT", "url": listing, "deadline": "30. 6. 2030"}]
+        asyncio.run(run_watch_cycle(app, store, apvv_queries, report_fn=report_fn))
+        assert len(store.load("Výzvy APVV")) == 2
+        again = asyncio.run(run_watch_cycle(app, store, apvv_queries, report_fn=report_fn))[0]
+        assert again["status"] == "unchanged"
+
+    assert len(reports) == 3
+    print("✅ Watch režim hlási iba zmeny.")
+
+def test_adaptive_search_loop():
+    """Prvé kolo beží naraz, doplňujúce kolá skončia skôr pri dostatku silných kandidátov."""
+    class ScoredSearchTool:
+        def __init__(self, per_query: int, score: float):
+            self.per_query, self.score = per_query, score
+            self.calls = []
+
+        def invoke(self, tool_input):
+            query = tool_input["query"]
+            self.calls.append(query)
+            return [{"title": f"{query} výzva {i}", "url": f"https://example.com/{query}/{i}",
+                     "content": f"{query} grant {i}", "score": self.score} for i in range(self.per_query)]
+
+    original_tool = nodes.search_tool
+    try:
+        # Prvé kolo beží celé naraz (latencia jedného dopytu), aj keď by stačila časť dopytov
+        nodes.search_tool = ScoredSearchTool(per_query=10, score=0.9)
+        queries = [f"q{i}" for i in range(6)]
+        output = nodes.node_search_executor({"optimized_queries": queries})
+        # Dopyty v rámci vlny bežia paralelne, poradie volaní nie je dané
+        assert sorted(nodes.search_tool.calls) == queries
+        assert output["executed_queries"] == queries and output["search_round"] == 1
+        assert nodes.route_after_search(output) == "result_ranker"
+
+        # Doplňujúce kolo: dosť silných kandidátov po prvej vlne, zvyšné dopyty sa nespustia
+        nodes.search_tool = ScoredSearchTool(per_query=10, score=0.9)
+        extra = [f"x{i}" for i in range(6)]
+        output = nodes.node_search_executor({"optimized_queries": extra, "executed_queries": ["q0"], "search_round": 1})
+        assert sorted(nodes.search_tool.calls) == extra[:nodes.SEARCH_WAVE_SIZE]
+        assert output["executed_queries"] == ["q0"] + extra[:nodes.SEARCH_WAVE_SIZE] and output["search_round"] == 2
+
+        # Slabé výsledky: doplňujúce kolo, ktoré spustí iba nové dopyty a pridá výsledky k predchádzajúcim
+        nodes.search_tool = ScoredSearchTool(per_query=2, score=0.1)
+        first = nodes.node_search_executor({"optimized_queries": ["q1", "q2"]})
+        assert nodes.route_after_search(first) == "query_optimizer"
+        second = nodes.node_search_executor({**first, "optimized_queries": ["q2", "q3"]})
+        assert sorted(nodes.search_tool.calls) == ["q1", "q2", "q3"]
+        assert len(second["search_results"]) == 6 and second["search_round"] == 2
+        # Limit kôl: ďalej už ide ranking aj pri nedostatku kandidátov
+        assert nodes.route_after_search(second) == "result_ranker"
+
+        # Dopyty doplňujúceho kola zoradené po regiónoch (ako ich vracia optimizer):
+        # predčasné ukončenie nevynechá EU ani Global
+        regional = ["APVV výzva etika", "VEGA granty filozofia", "KEGA teológia",
+                    "Horizon Europe ethics call", "Templeton Foundation religion grants"]
+        supplementary = {"optimized_queries": regional, "executed_queries": ["q0"], "search_round": 1}
+        nodes.search_tool = ScoredSearchTool(per_query=10, score=0.9)
+        output = nodes.node_search_executor(supplementary)
+        assert {nodes.query_region(query) for query in output["executed_queries"][1:]} == {"Slovakia", "EU", "Global"}
+        assert len(output["executed_queries"]) == 1 + nodes.SEARCH_WAVE_SIZE
+
+        # Aj pri menšej vlne sa skončí až po pokrytí všetkých regiónov
+        original_wave = nodes.SEARCH_WAVE_SIZE
+        nodes.SEARCH_WAVE_SIZE = 1
+        try:
+            nodes.search_tool = ScoredSearchTool(per_query=20, score=0.9)
+            output = nodes.node_search_executor(supplementary)
+        finally:
+            nodes.SEARCH_WAVE_SIZE = original_wave
+        assert [nodes.query_region(query) for query in output["executed_queries"][1:]] == ["Slovakia", "EU", "Global"]
+    finally:
+        nodes.search_tool = original_tool
+    print("✅ Adaptívne vyhľadávanie šetrí dopyty a pri nedostatku kandidátov pridá kolo.")
+
+def test_regional_fan_out():
+    """Regionálny režim spustí paralelnú vetvu pre každý región a granty zlúči bez duplicít."""
+    from benchmarks.fakes import FakeChatModel, FakeSearchTool
+    from src.agent.graph import create_graph
+
+    class RecordingLLM(FakeChatModel):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.prompts = []
+
+        def _record(self, kind, prompt):
+            self.prompts.append((kind, prompt))
+            super()._record(kind, prompt)
+
+    fake_llm = RecordingLLM(num_queries=2)
+    original = (nodes.llm, nodes.search_tool, nodes.grant_store)
+    nodes.llm, nodes.grant_store = fake_llm, None
+    nodes.search_tool = FakeSearchTool(results_per_query=4, content_size=200, overlap=0.5)
+    try:
+        app = create_graph(mode="regional", exporter=None)
+        final_state = app.invoke({"user_query": "Granty pre etiku AI"})
+    finally:
+        nodes.llm, nodes.search_tool, nodes.grant_store = original
+
+    optimizer_prompts = [prompt for kind, prompt in fake_llm.prompts if kind == "query_optimizer"]
+    for region in ("Slovakia", "EU", "Global"):
+        assert any(f"iba pre región: {nodes.REGION_FOCUS[region]}" in prompt for prompt in optimizer_prompts)
+    grants = final_state["structured_grants"]
+    urls = [canonicalize_url(grant["url"]) for grant in grants]
+    assert grants and len(urls) == len(set(urls))
+    assert len(final_state["regional_grants"]) >= len(grants)
+    assert final_state["final_report"].startswith("# Prehľad grantových príležitostí")
+    print(f"✅ Regionálne vetvy bežia paralelne a granty sa zlúčia ({len(grants)} grantov).")
+
+def test_deadline_prefilter():
+    """Lokálny parser termínov (SK + EN) vyradí výzvy s uplynutým termínom ešte pred LLM analýzou."""
+    from src.agent.deadlines import extract_deadlines, find_dates, grant_deadline, is_expired
+
+    assert extract_deadlines("Žiadosti je možné podať do 15. marca 2025.") == [datetime.date(2025, 3, 15)]
+    assert extract_deadlines("Deadline: 2025-03-15") == [datetime.date(2025, 3, 15)]
+    assert extract_deadlines("Applications close on March 15th, 2027") == [datetime.date(2027, 3, 15)]
+    assert extract_deadlines("Uzávierka výzvy: 30.9.2026") == [datetime.date(2026, 9, 30)]
+    # Dátum bez kontextu termínu (napr. dátum publikovania) nie je deadline
+    assert [item["is_deadline"] for item in find_dates("Uzávierka 31. 12. 2024, publikované 1. februára 2026")] == [True, False]
+    assert find_dates("Deadline 30 Feb 2025") == []
+
+    today = datetime.date(2026, 1, 1)
+    results = [
+        {"title": "Uzavretá výzva APVV", "url": "https://apvv.sk/2024", "content": "Grant pre etiku. Uzávierka: 31.12.2024"},
+        {"title": "ERC Advanced Grant", "url": "https://erc.europa.eu", "content": "Ethics call. Deadline 2024-05-01, next deadline: 12 March 2030."},
+        {"title": "Grant pre etiku", "url": "https://example.com/etika", "content": "Grant pre etiku, publikované 12. januára 2023."},
+    ]
+    assert [is_expired(res, today) for res in results] == [True, False, False]
+
+    ranked = nodes.node_result_ranker({"search_results": results, "user_query": "grant etika"})["ranked_results"]
+    assert "https://apvv.sk/2024" not in {res["url"] for res in ranked} and len(ranked) == 2
+
+    # Normalizovaný dátum deadlinu: dopĺňa sa lokálne po analýze, schéma pre LLM ho neobsahuje
+    assert "deadline_date" not in GrantInfo.schema()["properties"]
+    analysis = GrantAnalysis(grants=[
+        GrantInfo(title="Neskôr", url="https://example.com/b", relevance_explanation="x", deadline="do 30. júna 2030", funding_body="APVV", region="Slovakia"),
+        GrantInfo(title="Skôr", url="https://example.com/a", relevance_explanation="x", deadline="Deadline: March 1, 2030", funding_body="APVV", region="Slovakia"),
+    ])
+
+    class StaticAnalystLLM(FakeAnalystLLM):
+        def _analyze(self, messages):
+            return analysis
+
+    original_llm, original_store = nodes.llm, nodes.grant_store
+    nodes.llm, nodes.grant_store = StaticAnalystLLM(), None
+    try:
+        grants = nodes.node_grant_analyst({"ranked_results": results[1:], "user_query": "etika"})["structured_grants"]
+    finally:
+        nodes.llm, nodes.grant_store = original_llm, original_store
+    assert [grant["deadline_date"] for grant in grants] == [datetime.date(2030, 6, 30), datetime.date(2030, 3, 1)]
+    assert grant_deadline({"deadline_date": "2030-03-01"}) == datetime.date(2030, 3, 1)
+    report = render_report("etika", grants)
+    assert report.index("Skôr") < report.index("Neskôr")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GrantStore(os.path.join(tmp_dir, "grants.sqlite"), ttl_seconds=3600)
+        store.record_page({"url": "https://example.com/page", "content": "x"}, "etika", grants)
+        found = store.search(deadline_before=datetime.date(2030, 4, 1))
+        assert [grant["title"] for grant in found] == ["Skôr"]
+        assert found[0]["deadline_date"] == datetime.date(2030, 3, 1)
+    print("✅ Lokálny parser termínov vyradil uplynuté výzvy a deadline je normalizovaný na dátum.")
+
+def test_lazy_imports():
+    """Vstupné body CLI sa importujú bez ťažkých závislostí (LangChain, langgraph, OpenAI klient)."""
+    import subprocess
+    from benchmarks.import_time import ENTRY_POINTS, measure_import
+
+    for module in ENTRY_POINTS:
+        result = measure_import(module)
+        assert result["heavy_modules"] == [], f"{module} pri importe načíta {result['heavy_modules']}"
+
+    # --help odpovie bez načítania grafu a bez API kľúčov
+    completed = subprocess.run(
+        [sys.executable, os.path.join("src", "main.py"), "--help"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, encoding="utf-8"
+    )
+    assert completed.returncode == 0 and "--run-id" in completed.stdout
+    print("✅ Vstupné body sa importujú bez ťažkých závislostí (lenivé importy).")
+
 if __name__ == "__main__":
     print("Spúšťam integračné testy pre Grant Finder Agenta...\n")
     test_models()
@@ -90,4 +992,56 @@ if __name__ == "__main__":
     test_search_tool()
     print("-" * 20)
     test_date()
+    print("-" * 20)
+    test_search_executor_parallel()
+    print("-" * 20)
+    test_search_timeout()
+    print("-" * 20)
+    test_search_cache()
+    print("-" * 20)
+    test_deduplication()
+    print("-" * 20)
+    test_merge_grants_listing_page()
+    print("-" * 20)
+    test_merge_grants_generic_title()
+    print("-" * 20)
+    test_grant_analyst_map_reduce()
+    print("-" * 20)
+    test_result_ranker()
+    print("-" * 20)
+    test_template_report()
+    print("-" * 20)
+    test_batch_mode_resume()
+    print("-" * 20)
+    test_llm_cache()
+    print("-" * 20)
+    test_grant_store_incremental()
+    print("-" * 20)
+    test_grant_store_query_scoped()
+    print("-" * 20)
+    test_benchmark_smoke()
+    print("-" * 20)
+    test_node_tracing()
+    print("-" * 20)
+    test_service_coalescing_and_backpressure()
+    print("-" * 20)
+    test_report_streaming()
+    print("-" * 20)
+    test_context_packing()
+    print("-" * 20)
+    test_checkpoint_resume()
+    print("-" * 20)
+    test_resilience()
+    print("-" * 20)
+    test_llm_breaker_probe()
+    print("-" * 20)
+    test_watch_mode_delta()
+    print("-" * 20)
+    test_adaptive_search_loop()
+    print("-" * 20)
+    test_regional_fan_out()
+    print("-" * 20)
+    test_deadline_prefilter()
+    print("-" * 20)
+    test_lazy_imports()
     print("\nTesty dokončené!")